@@ -0,0 +1,250 @@
+"""Performance benchmarks for the generator, solver, parsers and renderer.
+
+    python benchmark.py --save benchmark_baseline.json
+    python benchmark.py --compare benchmark_baseline.json --threshold 0.25
+
+Every case is timed without tracing (best of --repeat runs) and then run once more
+under tracemalloc for its peak memory. A case that returns a float reports the time of
+its own part of the work, the slowest slice of an animated solve for example. With --compare the exit code is 1 when any
+case got slower or needs more memory than the baseline allows.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from interface.maze_interface import MazeInterface
+from interface.maze_solver_interface import MazeSolverInterface
+from interface.model.maze_solver import MazeSolver, WaveRun
+from interface.model.base_classes.point import Point
+from frontend.parser.maze_data import read_file, write_file
+from frontend.parser.maze_binary import read_binary, write_binary
+
+SIZES = (10, 100, 500, 1000, 2000, 4000)
+# The classic generator is quadratic in the width, bigger sizes take minutes
+CLASSIC_MAX_SIZE = 500
+# Wilson's random walks run cell by cell in Python
+WILSON_MAX_SIZE = 500
+RANDOM_PAIRS = 20
+# Time budget of one animation frame of the solve, the same as WAVE_FRAME_MS of the GUI
+WAVE_SLICE_SECONDS = 0.008
+GROUPS = ("generate", "solve", "parse", "render")
+# Absolute slack on top of the relative threshold, sub-millisecond cases are mostly noise
+NOISE_SECONDS = 0.002
+NOISE_BYTES = 64 * 1024
+
+# setup() prepares the inputs outside of the measurement and returns the timed callable
+Setup = Callable[[], Callable[[], Any]]
+
+
+@dataclass
+class Result:
+    name: str
+    seconds: float
+    peak_bytes: int
+    cells: int
+
+    @property
+    def cells_per_second(self) -> float:
+        return self.cells / self.seconds if self.seconds > 0 else float("inf")
+
+
+def measure(name: str, cells: int, setup: Setup, repeat: int) -> Result:
+    run = setup()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        seconds = run()
+        if not isinstance(seconds, float):
+            seconds = time.perf_counter() - start
+        best = min(best, seconds)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(name, best, peak, cells)
+
+
+def generate_cases(sizes: List[int]) -> Iterator[Tuple[str, int, Setup]]:
+    interface = MazeInterface()
+    for algorithm in ("classic", "linear", "parallel", "binary_tree", "sidewinder", "kruskal", "wilson"):
+        for size in sizes:
+            if algorithm == "classic" and size > CLASSIC_MAX_SIZE or algorithm == "wilson" and size > WILSON_MAX_SIZE:
+                continue
+            yield (f"generate/{algorithm}/{size}x{size}", size * size,
+                   lambda algorithm=algorithm, size=size:
+                   lambda: interface.generate_maze(size, size, algorithm=algorithm, seed=1))
+
+
+def solve_cases(sizes: List[int]) -> Iterator[Tuple[str, int, Setup]]:
+    for engine in ("python", "numpy", "tree"):
+        for size in sizes:
+            def corner(engine=engine, size=size):
+                maze = MazeInterface().generate_maze(size, size, algorithm="linear", seed=1)
+                solver = MazeSolverInterface(cache_size=0)
+                from_, to = Point(0, 0, None, 0, 0), Point(0, 0, None, size - 1, size - 1)
+                return lambda: solver.solve(from_, to, maze, engine=engine)
+
+            def pairs(engine=engine, size=size):
+                maze = MazeInterface().generate_maze(size, size, algorithm="linear", seed=1)
+                solver = MazeSolverInterface(cache_size=0)
+                rng = random.Random(size)
+                queries = [(Point(0, 0, None, rng.randrange(size), rng.randrange(size)),
+                            Point(0, 0, None, rng.randrange(size), rng.randrange(size)))
+                           for _ in range(RANDOM_PAIRS)]
+
+                def run():
+                    # The tree index is built on the first query and reused by the rest
+                    solver.reset_index()
+                    for from_, to in queries:
+                        solver.solve(from_, to, maze, engine=engine)
+                return run
+
+            yield f"solve/{engine}/corner/{size}x{size}", size * size, corner
+            yield f"solve/{engine}/pairs/{size}x{size}", size * size * RANDOM_PAIRS, pairs
+
+    for size in sizes:
+        def wave_slice(size=size):
+            maze = MazeInterface().generate_maze(size, size, algorithm="linear", seed=1)
+            from_, to = Point(0, 0, None, 0, 0), Point(0, 0, None, size - 1, size - 1)
+
+            def run():
+                # Slowest advance() of the whole animation, it should stay close to the budget
+                waves = WaveRun(MazeSolver().iter_wave(from_, to, maze))
+                slowest = 0.0
+                while not waves.done:
+                    start = time.perf_counter()
+                    waves.advance(WAVE_SLICE_SECONDS)
+                    slowest = max(slowest, time.perf_counter() - start)
+                return slowest
+            return run
+
+        yield f"solve/wave/slowest_slice/{size}x{size}", size * size, wave_slice
+
+
+def parse_cases(sizes: List[int], directory: str) -> Iterator[Tuple[str, int, Setup]]:
+    for fmt, write, read in (("text", write_file, read_file), ("binary", write_binary, read_binary)):
+        for size in sizes:
+            def round_trip(write=write, read=read, size=size, fmt=fmt):
+                maze = MazeInterface().generate_maze(size, size, algorithm="linear", seed=1)
+                filename = os.path.join(directory, f"{fmt}_{size}")
+
+                def run():
+                    write(filename, maze)
+                    return read(filename)
+                return run
+
+            yield f"parse/{fmt}/round_trip/{size}x{size}", size * size, round_trip
+
+
+def render_cases(sizes: List[int]) -> Iterator[Tuple[str, int, Setup]]:
+    # The widget is rendered the way paintEvent does on a cache miss, into an offscreen pixmap
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtCore import QPointF
+        from PySide6.QtWidgets import QApplication
+        from frontend.openglwidget import MazeOpenGLWidget
+    except ImportError as e:
+        print(f"skipping render benchmarks: {e}", file=sys.stderr)
+        return
+    app = QApplication.instance() or QApplication([])
+    widget = MazeOpenGLWidget()
+
+    for size in sizes:
+        for view, zoom in (("fit", 1.0), ("zoomed", 16.0)):
+            def render(size=size, zoom=zoom):
+                maze = MazeInterface().generate_maze(size, size, algorithm="linear", seed=1)
+                widget.set_maze_coordinates(size, size, maze)
+                widget.zoom_at(QPointF(widget.width() / 2, widget.height() / 2), zoom)
+                widget.build_wall_layer()  # Warms the density pyramid, it is built once per maze
+                return widget.build_wall_layer
+
+            yield f"render/{view}/{size}x{size}", size * size, render
+    app.processEvents()
+
+
+def run_benchmarks(groups: List[str], sizes: List[int], repeat: int) -> List[Result]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        cases = {
+            "generate": lambda: generate_cases(sizes),
+            "solve": lambda: solve_cases(sizes),
+            "parse": lambda: parse_cases(sizes, directory),
+            "render": lambda: render_cases(sizes),
+        }
+        for group in groups:
+            for name, cells, setup in cases[group]():
+                result = measure(name, cells, setup, repeat)
+                print(f"{name:40} {result.seconds * 1000:10.2f} ms {result.peak_bytes / 2 ** 20:9.2f} MiB "
+                      f"{result.cells_per_second:14,.0f} cells/s", flush=True)
+                results.append(result)
+    return results
+
+
+def save_baseline(filename, results: List[Result]):
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    with open(filename, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    # Cases missing from the baseline are new and never count as regressions
+    regressions = []
+    for result in results:
+        old = baseline.get(result.name)
+        if old is None:
+            continue
+        if result.seconds > old["seconds"] * (1 + threshold) + NOISE_SECONDS:
+            regressions.append(f"{result.name}: {old['seconds'] * 1000:.2f} ms -> {result.seconds * 1000:.2f} ms")
+        if result.peak_bytes > old["peak_bytes"] * (1 + threshold) + NOISE_BYTES:
+            regressions.append(f"{result.name}: peak {old['peak_bytes'] / 2 ** 20:.2f} MiB -> "
+                               f"{result.peak_bytes / 2 ** 20:.2f} MiB")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark maze generation, solving, parsing and rendering")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"comma separated groups out of {', '.join(GROUPS)}")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma separated square maze sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the best one counts")
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="JSON baseline to check the results against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown or memory growth (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    groups = [group for group in args.only.split(",") if group]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    results = run_benchmarks(groups, sizes, args.repeat)
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Headless maze generation and solving, no Qt is imported.
+
+    python cli.py generate --size 200x300 --count 8 --seed 1 --out corpus/
+    python cli.py generate --size 32x32 --count 100000 --format hdf5 --out corpus.h5
+    python cli.py solve corpus/maze_200x300_1.txt queries.txt --out paths.txt
+    python cli.py render corpus/maze_200x300_1.txt maze.png --cell-size 6 --path 0 0 199 299
+
+A query file holds one query per line: from_row from_col to_row to_col.
+"""
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from interface.maze_interface import MazeInterface
+from interface.maze_solver_interface import MazeSolverInterface
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.base_classes.point import Point
+from frontend.parser.maze_data import read_file, write_rows
+from frontend.parser.maze_binary import open_binary, read_binary, write_binary_rows, BINARY_SUFFIX
+from frontend.parser.maze_image import DEFAULT_CELL_PIXELS, write_png
+from frontend.parser.maze_corpus import MazeCorpus
+
+def parse_size(text: str) -> Tuple[int, int]:
+    try:
+        rows, cols = (int(x) for x in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Size must look like ROWSxCOLS, got {text}")
+    if rows < 1 or cols < 1:
+        raise argparse.ArgumentTypeError(f"Size must be positive, got {text}")
+    return rows, cols
+
+
+def read_maze(filename, validate: bool = False) -> MazeGrid:
+    if str(filename).endswith(BINARY_SUFFIX):
+        return read_binary(filename, validate=validate)
+    return read_file(filename, validate=validate)
+
+
+def generate_job(rows: int, cols: int, seed: int, algorithm: str, directory: str, binary: bool) -> str:
+    # Rows are streamed straight into the file, the whole maze never sits in memory
+    suffix = BINARY_SUFFIX if binary else ".txt"
+    filename = os.path.join(directory, f"maze_{rows}x{cols}_{seed}{suffix}")
+    rows_iter = MazeInterface().iter_rows(rows, cols, algorithm=algorithm, seed=seed)
+    if binary:
+        write_binary_rows(filename, rows, cols, rows_iter)
+    else:
+        write_rows(filename, rows, cols, rows_iter)
+    return filename
+
+
+def generate_grid(rows: int, cols: int, seed: int, algorithm: str) -> MazeGrid:
+    return MazeInterface().generate_maze(rows, cols, algorithm=algorithm, seed=seed)
+
+
+def generate_corpus(args, sizes: List[Tuple[int, int]], base_seed: int) -> int:
+    # Workers only generate, this process is the single writer appending to the corpus file
+    seeds = [base_seed + i for i in range(len(sizes))]
+    with MazeCorpus(args.out, "a") as corpus, ProcessPoolExecutor(max_workers=args.workers) as executor:
+        mazes = executor.map(generate_grid, *zip(*sizes), seeds, [args.algorithm] * len(sizes), chunksize=64)
+        first = len(corpus)
+        corpus.extend((maze, seed, args.algorithm, {}) for maze, seed in zip(mazes, seeds))
+        print(f"{args.out} mazes {first}..{len(corpus) - 1}")
+    return 0
+
+
+def generate(args) -> int:
+    base_seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    sizes = [size for size in args.size for _ in range(args.count)]
+    if args.format == "hdf5":
+        return generate_corpus(args, sizes, base_seed)
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [(rows, cols, base_seed + i, args.algorithm, args.out, args.format == "binary")
+            for i, (rows, cols) in enumerate(sizes)]
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for filename in executor.map(generate_job, *zip(*jobs)):
+            print(filename)
+    return 0
+
+
+def read_queries(filename, shape: Tuple[int, int]) -> Iterator[Tuple[int, int, int, int]]:
+    rows, cols = shape
+    with open(filename) as f:
+        for number, line in enumerate(f, start=1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            values = line.split()
+            if len(values) != 4:
+                raise ValueError(f"{filename}:{number}: expected from_row from_col to_row to_col")
+            from_row, from_col, to_row, to_col = (int(x) for x in values)
+            if not (0 <= from_row < rows and 0 <= to_row < rows and 0 <= from_col < cols and 0 <= to_col < cols):
+                raise ValueError(f"{filename}:{number}: query is outside of a {rows}x{cols} maze")
+            yield from_row, from_col, to_row, to_col
+
+
+def format_path(path: List[Tuple[int, int]] | None) -> str:
+    # Distance followed by the cells from start to end, -1 when the end is unreachable
+    if not path:
+        return "-1"
+    return " ".join([str(len(path) - 1)] + [f"{row},{col}" for row, col in reversed(path)])
+
+
+def solve(args) -> int:
+    maze = read_maze(args.maze, validate=args.validate)
+    paths = MazeSolverInterface(args.cache_size).solve_batch(read_queries(args.queries, maze.shape), maze,
+                                                             engine=args.engine, workers=args.workers)
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        for path in paths:
+            out.write(format_path(path) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def render(args) -> int:
+    path = None
+    if args.path is None and str(args.maze).endswith(BINARY_SUFFIX):
+        # Nothing to solve, the file is rasterized band by band without loading it whole
+        maze = open_binary(args.maze)
+    else:
+        maze = read_maze(args.maze)
+    if args.path is not None:
+        rows, cols = maze.shape
+        from_row, from_col, to_row, to_col = args.path
+        if not (0 <= from_row < rows and 0 <= to_row < rows and 0 <= from_col < cols and 0 <= to_col < cols):
+            raise ValueError(f"Path ends must be inside of the {rows}x{cols} maze")
+        path = MazeSolverInterface().solve(Point(0, 0, None, from_row, from_col), Point(0, 0, None, to_row, to_col),
+                                           maze, engine="numpy")
+    width, height = write_png(args.out, maze, path, args.cell_size, args.wall_width)
+    print(f"{args.out} {width}x{height}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: all cores)")
+    parser = argparse.ArgumentParser(description="Generate and solve mazes without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", parents=[common], help="generate mazes into a directory")
+    generate_parser.add_argument("--size", type=parse_size, action="append", required=True,
+                                 help="maze size as ROWSxCOLS, may be repeated")
+    generate_parser.add_argument("--count", type=int, default=1, help="mazes per size")
+    generate_parser.add_argument("--seed", type=int, help="seed of the first maze, the next ones count up")
+    generate_parser.add_argument("--algorithm", "--mode", default="linear", choices=sorted(MazeInterface().generators),
+                                 help="generator out of the registry, --mode is the old name of this option")
+    generate_parser.add_argument("--format", default="text", choices=("text", "binary", "hdf5"),
+                                 help="one file per maze, or hdf5 to append all of them to one corpus file")
+    generate_parser.add_argument("--out", default=".", help="output directory, or the corpus file for hdf5")
+    generate_parser.set_defaults(handler=generate)
+
+    solve_parser = commands.add_parser("solve", parents=[common],
+                                       help="answer a file of path queries on one maze")
+    solve_parser.add_argument("maze", help=f"maze file, text or binary (*{BINARY_SUFFIX})")
+    solve_parser.add_argument("queries", help="file with one 'from_row from_col to_row to_col' per line")
+    solve_parser.add_argument("--engine", default="python", choices=("python", "numpy", "tree"))
+    solve_parser.add_argument("--cache-size", type=int, default=0,
+                              help="distance fields kept per worker for the python engine, a miss floods the "
+                                   "whole maze, so it only pays off when many queries share a start cell")
+    solve_parser.add_argument("--out", help="output file (default: stdout)")
+    solve_parser.add_argument("--validate", action="store_true",
+                              help="refuse mazes that are not perfect, with one path between any two cells")
+    solve_parser.set_defaults(handler=solve)
+
+    render_parser = commands.add_parser("render", help="draw a maze and optionally a path into a PNG file")
+    render_parser.add_argument("maze", help=f"maze file, text or binary (*{BINARY_SUFFIX})")
+    render_parser.add_argument("out", help="PNG file to write")
+    render_parser.add_argument("--cell-size", type=int, default=DEFAULT_CELL_PIXELS,
+                               help="pixels per cell including its wall")
+    render_parser.add_argument("--wall-width", type=int, default=1, help="wall thickness in pixels")
+    render_parser.add_argument("--path", type=int, nargs=4, metavar=("FROM_ROW", "FROM_COL", "TO_ROW", "TO_COL"),
+                               help="draw the shortest path between two cells")
+    render_parser.set_defaults(handler=render)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as error:
+        # Bad input files and mazes refused by --validate, a message is enough
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
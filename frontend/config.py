@@ -1,4 +1,5 @@
 from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QColor
 
 WIDTH = 500
 HEIGHT = 500
@@ -6,6 +7,29 @@ BUTTON_WIDTH = 100
 BUTTON_HEIGHT = 50
 SPACE = 20
 DEFAULT_CELL_SIZE = 50
+GENERATION_MODE = "linear"
+MAX_MAZE_SIZE = 10000
+# Check opened files for being perfect mazes in a background job, the report is logged and lets
+# the solver answer pairs in different components without a search
+VALIDATE_ON_LOAD = True
+# Distance fields kept by the solver, clicking ends one by one from a fixed start reuses the field
+SOLVE_CACHE_SIZE = 8
+
+# Viewport: wheel steps scale cells by ZOOM_STEP, cells never grow past MAX_CELL_PIXELS and
+# below LOD_CELL_PIXELS the walls are shown as a downsampled wall density raster
+ZOOM_STEP = 1.25
+MAX_CELL_PIXELS = 200
+LOD_CELL_PIXELS = 2
+
+# Solve animation: every WAVE_TIMER_MS the search runs for at most about WAVE_FRAME_MS,
+# cells already reached and the ones reached in the latest frame are tinted over the walls
+WAVE_TIMER_MS = 16
+WAVE_FRAME_MS = 8
+GL_WAVE_COLOR = QColor(64, 128, 255, 80)
+GL_WAVE_FRONT_COLOR = QColor(64, 128, 255, 220)
+
+# Distance heatmap under the walls, the start is at the first stop and the farthest cell at the last
+GL_HEAT_STOPS = [(49, 54, 149), (69, 117, 180), (171, 217, 233), (254, 224, 144), (244, 109, 67), (165, 0, 38)]
 
 GL_BACKGROUND_COLOR = Qt.white
 GL_LINE_COLOR = Qt.black
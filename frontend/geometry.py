@@ -0,0 +1,132 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from interface.model.base_classes.maze_grid import MazeGrid
+
+
+def wall_runs(plane: np.ndarray) -> np.ndarray:
+    # Runs of consecutive walls along every row of `plane` as (row, start, stop) triples
+    rows, cols = plane.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = plane != 0
+    edges = np.diff(padded, axis=1)
+    starts = np.nonzero(edges == 1)
+    stops = np.nonzero(edges == -1)
+    return np.column_stack((starts[0], starts[1], stops[1]))
+
+
+def wall_segments(maze: MazeGrid) -> Tuple[np.ndarray, np.ndarray]:
+    """Merged wall segments of a maze in cell units.
+
+    Horizontal segments (row, start, stop) run along the bottom edge of `row` from
+    x = start to x = stop. Vertical segments (col, start, stop) run along the right
+    edge of `col` from y = start to y = stop.
+    """
+    return wall_runs(maze.bottom), wall_runs(maze.right.T)
+
+
+def visible_range(offset: float, cell_size: float, extent: float, count: int) -> Tuple[int, int]:
+    # Cells along one axis that intersect [0, extent) once the maze origin is shifted to `offset`
+    start = min(count, max(0, int(np.floor(-offset / cell_size))))
+    stop = min(count, int(np.ceil((extent - offset) / cell_size)))
+    return start, max(start, stop)
+
+
+def cell_index(position: float, offset: float, cell_size: float, count: int) -> Optional[int]:
+    # Cell under a pixel along one axis, None outside of the maze
+    index = math.floor((position - offset) / cell_size)
+    return index if 0 <= index < count else None
+
+
+def zoom_offset(anchor: float, offset: float, scale: float) -> float:
+    # Offset after scaling the cells by `scale` so that the point under `anchor` stays there
+    return anchor - (anchor - offset) * scale
+
+
+def clamp_offset(offset: float, extent: float, size: float) -> float:
+    # Keeps a maze of `size` pixels covering the view of `extent` pixels
+    return min(0.0, max(extent - size, offset))
+
+
+def lod_level(cell_pixels: float, levels: int) -> int:
+    # Coarsest pyramid level whose texels still cover at least one pixel
+    return min(levels - 1, max(0, math.ceil(math.log2(1 / cell_pixels))))
+
+
+def lod_window(row_start: int, row_stop: int, col_start: int, col_stop: int,
+               level: int) -> Tuple[int, int, int, int]:
+    # Texels of a pyramid level that cover the given cells
+    step = 1 << level
+    return row_start // step, -(-row_stop // step), col_start // step, -(-col_stop // step)
+
+
+def wall_density_pyramid(maze: MazeGrid) -> List[np.ndarray]:
+    """Mipmap levels of wall density, level k covers 2**k x 2**k cells per texel.
+
+    Density is 0 for a cell without walls and 254 for a cell with both walls, every
+    level is the 2x2 mean of the previous one.
+    """
+    level = (maze.right.astype(np.uint8) + maze.bottom) * np.uint8(127)
+    levels = [level]
+    while level.shape[0] > 1 or level.shape[1] > 1:
+        rows, cols = level.shape
+        padded = np.pad(level, ((0, rows % 2), (0, cols % 2)), mode="edge").astype(np.uint16)
+        level = ((padded[0::2, 0::2] + padded[1::2, 0::2] + padded[0::2, 1::2] + padded[1::2, 1::2]) // 4)
+        level = level.astype(np.uint8)
+        levels.append(level)
+    return levels
+
+
+def mark_pyramid(rows: int, cols: int) -> List[np.ndarray]:
+    # Empty per-cell marks with the level shapes of wall_density_pyramid
+    levels = [np.zeros((rows, cols), dtype=np.uint8)]
+    while rows > 1 or cols > 1:
+        rows, cols = -(-rows // 2), -(-cols // 2)
+        levels.append(np.zeros((rows, cols), dtype=np.uint8))
+    return levels
+
+
+def mark_cells(levels: List[np.ndarray], cells: np.ndarray, value: int):
+    # Sets the mark of (row, col) pairs on every level, coarse texels show the last mark set inside them
+    rows, cols = cells[:, 0], cells[:, 1]
+    for k, level in enumerate(levels):
+        level[rows >> k, cols >> k] = value
+
+
+def heat_levels(distances: np.ndarray) -> List[np.ndarray]:
+    """Distance field as palette indices, one array per level of wall_density_pyramid.
+
+    Unreachable cells get 0, reachable ones 1..255 by their share of the largest
+    distance. Level k keeps every 2**k-th cell of every 2**k-th row.
+    """
+    farthest = max(int(distances.max(initial=0)), 1)
+    scaled = distances.astype(np.float32) * np.float32(254 / farthest) + 1
+    level = np.where(distances >= 0, scaled, 0).astype(np.uint8)
+    levels = [level]
+    step = 1
+    while level.shape[0] > 1 or level.shape[1] > 1:
+        step *= 2
+        level = np.ascontiguousarray(levels[0][::step, ::step])
+        levels.append(level)
+    return levels
+
+
+def heat_palette(stops: List[Tuple[int, int, int]]) -> List[int]:
+    # 256 ARGB colors, 0 is transparent and 1..255 run through the RGB stops
+    positions = np.linspace(0, len(stops) - 1, 255)
+    channels = np.array(stops, dtype=np.float64)
+    rgb = np.stack([np.interp(positions, np.arange(len(stops)), channels[:, c]) for c in range(3)], axis=1)
+    rgb = np.rint(rgb).astype(np.uint32)
+    return [0] + (0xFF000000 | rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]).tolist()
+
+
+def path_corners(path: List[Tuple[int, int]]) -> np.ndarray:
+    # Both ends and every cell where the path turns, a polyline through them covers the whole path
+    points = np.asarray(path, dtype=np.int64).reshape(-1, 2)
+    if len(points) < 3:
+        return points
+    steps = np.diff(points, axis=0)
+    turns = np.any(steps[1:] != steps[:-1], axis=1)
+    return points[np.concatenate(([True], turns, [True]))]
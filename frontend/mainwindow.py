@@ -1,7 +1,7 @@
 from datetime import datetime
 import logging
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool
 from PySide6.QtGui import QPalette, QColor
 
 logger = logging.getLogger(name=__name__)
@@ -13,7 +13,9 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QVBoxLayout,
     QFileDialog,
-    QDoubleSpinBox
+    QDoubleSpinBox,
+    QProgressBar,
+    QCheckBox
 )
 
 from .config import (
@@ -21,21 +23,31 @@ from .config import (
     WIDTH,
     SPACE,
     MAIN_BACKGROUND_COLOR,
-    BUTTON_SIZE
+    BUTTON_SIZE,
+    GENERATION_MODE,
+    MAX_MAZE_SIZE,
+    VALIDATE_ON_LOAD,
+    SOLVE_CACHE_SIZE
 )
 
-from .parser.maze_data import read_file
+from .parser.maze_data import read_file, write_file
+from .parser.maze_binary import read_binary, write_binary, BINARY_SUFFIX
 from interface.maze_solver_interface import MazeSolverInterface
 from interface.maze_interface import MazeInterface
+from interface.model.metrics import Metrics
 from .openglwidget import MazeOpenGLWidget, update_dots
+from .workers import MazeJob, GenerateJob, SolveJob, ValidateJob, connect_job
 
 
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
         self.data = None
-        self.solver = MazeSolverInterface()
+        self.solver = MazeSolverInterface(SOLVE_CACHE_SIZE)
         self.generator = MazeInterface()
+        # Generation and solving run on the pool, one job at a time
+        self.pool = QThreadPool.globalInstance()
+        self.job: MazeJob | None = None
         self.setStyleSheet(f"background-color: {MAIN_BACKGROUND_COLOR};")
         self.setWindowTitle("Python Maze")
         self.setFixedWidth(WIDTH + SPACE)
@@ -83,18 +95,21 @@ class MainWindow(QMainWindow):
     def read_file_button_clicked(self):
         update_dots(self.maze_widget)
         try:
-            fileName, _ = QFileDialog.getOpenFileName(self, "Open File", "", "Text files (*.txt)")
+            fileName, _ = QFileDialog.getOpenFileName(
+                self, "Open File", "", f"Maze files (*.txt *{BINARY_SUFFIX});;Text files (*.txt);;"
+                                       f"Binary mazes (*{BINARY_SUFFIX})")
             if fileName:
-                logger.info(f"filename is: {fileName}")
-                maze_data = read_file(fileName)
+                logger.info("filename is: %s", fileName)
+                if fileName.endswith(BINARY_SUFFIX):
+                    maze_data = read_binary(fileName)
+                else:
+                    maze_data = read_file(fileName)
                 self.data = maze_data
+                self.solver.invalidate()
 
-                rows = len(maze_data)
-                cols = len(maze_data[0]) if rows > 0 else 0
+                rows, cols = maze_data.shape
 
-                logger.info(f"Rows: {rows}, Cols: {cols}")
-                logger.info(f"Right Walls: {[[point.right for point in row] for row in maze_data]}")
-                logger.info(f"Bottom Walls: {[[point.bottom for point in row] for row in maze_data]}")
+                logger.info("Loaded a %dx%d maze", rows, cols)
 
                 if rows > 0 and cols > 0:
                     self.maze_widget.set_maze_coordinates(
@@ -103,21 +118,39 @@ class MainWindow(QMainWindow):
                         maze=self.data
                     )
                     self.maze_widget.file_open_flag = True
+                    if VALIDATE_ON_LOAD and self.job is None:
+                        self.start_job(ValidateJob(self.solver, self.data, metrics=self.job_metrics()),
+                                       self.show_report)
                 else:
                     logger.error("Parsed data is invalid. Ensure the file format is correct.")
             else:
                 logger.error("No file selected. Try again")
         except TypeError as e:
-            logger.error(f"Error: {e}. No file selected. Try again.")
+            logger.error("Error: %s. No file selected. Try again.", e)
         except FileNotFoundError as e:
-            logger.error(f"File not found: {e}. Try again.")
+            logger.error("File not found: %s. Try again.", e)
         except Exception as e:
-            logger.error(f"Unexpected error: {e}. Try again.")
+            logger.error("Unexpected error: %s. Try again.", e)
+
+    @staticmethod
+    def show_report(report):
+        if report.perfect:
+            logger.info(report.summary())
+        else:
+            logger.warning(report.summary())
 
     def generate(self):
+        if self.job is not None:
+            return
         update_dots(self.maze_widget)
         rows, cols = self.get_params()
-        self.data = self.generator.generate_maze(rows, cols)
+        self.start_job(GenerateJob(self.generator, rows, cols, GENERATION_MODE, metrics=self.job_metrics()),
+                       self.show_generated)
+
+    def show_generated(self, maze_data):
+        self.data = maze_data
+        self.solver.invalidate()
+        rows, cols = maze_data.shape
         self.maze_widget.set_maze_coordinates(
             rows=rows,
             cols=cols,
@@ -126,10 +159,48 @@ class MainWindow(QMainWindow):
         self.maze_widget.file_open_flag = True
         self.maze_widget.update()
 
+    def start_job(self, job: MazeJob, on_finished):
+        self.job = job
+        connect_job(job, on_finished, self.progress_bar.setValue, self.finish_job)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.button_cancel.show()
+        self.set_controls_enabled(False)
+        self.pool.start(job)
+
+    @staticmethod
+    def job_metrics() -> Metrics | None:
+        # Instrumentation is only switched on when its summary would be logged
+        return Metrics() if logger.isEnabledFor(logging.INFO) else None
+
+    def finish_job(self):
+        if self.job.metrics is not None:
+            logger.info("%s: %s", type(self.job).__name__, self.job.metrics.summary())
+        self.job = None
+        self.progress_bar.hide()
+        self.button_cancel.hide()
+        self.set_controls_enabled(True)
+
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.cancel()
+        elif self.maze_widget.wave_run is not None:
+            self.maze_widget.stop_wave()
+            self.end_animation()
+
+    def closeEvent(self, event):
+        self.cancel_job()
+        self.pool.waitForDone()
+        super().closeEvent(event)
+
+    def set_controls_enabled(self, enabled: bool):
+        for control in self.job_controls:
+            control.setEnabled(enabled)
+
     def get_params(self):
         r = int(self.rows_input.value())
         c = int(self.cols_input.value())
-        logger.info(f"Generate maze with rows = {r}, cols = {c}")
+        logger.info("Generate maze with rows = %d, cols = %d", r, c)
         return (r, c)
 
     def init_widgets(self):
@@ -154,23 +225,39 @@ class MainWindow(QMainWindow):
         button_draw_path = QPushButton("find path", self)
         button_draw_path.setFixedSize(BUTTON_SIZE)
         button_draw_path.clicked.connect(self.draw_path)
+
+        self.button_cancel = QPushButton("cancel", self)
+        self.button_cancel.setFixedSize(BUTTON_SIZE)
+        self.button_cancel.clicked.connect(self.cancel_job)
+        self.button_cancel.hide()
+
+        self.animate_check = QCheckBox("animate", self)
+        self.animate_check.setToolTip("Show the search wave while finding the path")
+        self.heat_check = QCheckBox("heatmap", self)
+        self.heat_check.setToolTip("Color every cell by its distance from the start")
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
         # Params for input
         self.rows_input = QDoubleSpinBox(self)
         self.rows_input.setValue(10)
         self.rows_input.setSuffix(" rows")
         self.rows_input.setDecimals(0)
-        self.rows_input.setMaximum(50)
+        self.rows_input.setMaximum(MAX_MAZE_SIZE)
         self.rows_input.setMinimum(1)
         self.cols_input = QDoubleSpinBox(self)
         self.cols_input.setValue(10)
         self.cols_input.setSuffix(" cols")
         self.cols_input.setDecimals(0)
-        self.cols_input.setMaximum(50)
+        self.cols_input.setMaximum(MAX_MAZE_SIZE)
         self.cols_input.setMinimum(1)
 
         parameters_layout = QVBoxLayout()
         parameters_layout.addWidget(self.rows_input)
         parameters_layout.addWidget(self.cols_input)
+        parameters_layout.addWidget(self.animate_check)
+        parameters_layout.addWidget(self.heat_check)
 
         # Add widgets
         central_widget = QWidget(parent=self)
@@ -181,35 +268,62 @@ class MainWindow(QMainWindow):
         controls_layout.addWidget(button_draw_path)
         controls_layout.addWidget(button_save_maze)
         controls_layout.addWidget(button_open_file)
+        self.job_controls = [button_generate_maze, button_draw_path, button_save_maze, button_open_file,
+                             self.animate_check, self.heat_check]
+
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.button_cancel)
 
         layout = QVBoxLayout()
         layout.addWidget(self.maze_widget)
         layout.addLayout(controls_layout)
+        layout.addLayout(progress_layout)
         central_widget.setLayout(layout)
         self.setCentralWidget(central_widget)
 
     def save_file(self):
-        rows = len(self.data)
-        cols = len(self.data[0])
-
-        right = [[point.right for point in row] for row in self.data]
-        bottom = [[point.bottom for point in row] for row in self.data]
-
-        with open(f"maze_{datetime.strftime(datetime.now(), "%y-%m-%d_%H:%M:%S")}.txt", "w+") as write_file:
-            write_file.write(f"{rows} {cols}\n")
-
-            for row in right:
-                write_file.write(" ".join(str(i) for i in row) + "\n")
-
-            write_file.write("\n")
-
-            for row in bottom:
-                write_file.write(" ".join(str(j) for j in row) + "\n")
+        if self.data is None:
+            return
+        fileName, _ = QFileDialog.getSaveFileName(
+            self, "Save File", f"maze_{datetime.strftime(datetime.now(), "%y-%m-%d_%H:%M:%S")}.txt",
+            f"Text files (*.txt);;Binary mazes (*{BINARY_SUFFIX})")
+        if not fileName:
+            return
+        if fileName.endswith(BINARY_SUFFIX):
+            write_binary(fileName, self.data)
+        else:
+            write_file(fileName, self.data)
 
     def draw_path(self):
-        if not (self.maze_widget.from_p and  self.maze_widget.to_p):
+        if self.job is not None or not (self.maze_widget.from_p and self.maze_widget.to_p):
+            return
+        if self.animate_check.isChecked():
+            self.start_animation()
             return
-        path = self.solver.solve(self.maze_widget.from_p, self.maze_widget.to_p, self.maze_widget.maze)
-        logger.info(f"{path}")
+        job = SolveJob(self.solver, self.maze_widget.from_p, self.maze_widget.to_p, self.maze_widget.maze,
+                       metrics=self.job_metrics(), distances=self.heat_check.isChecked())
+        self.start_job(job, lambda path: self.show_path(path, job.distances))
+
+    def start_animation(self):
+        # The search runs on the GUI thread in time slices driven by the widget's timer
+        self.button_cancel.show()
+        self.set_controls_enabled(False)
+        run = self.solver.wave_run(self.maze_widget.from_p, self.maze_widget.to_p, self.maze_widget.maze)
+        self.maze_widget.start_wave(run, self.finish_animation)
+
+    def finish_animation(self, path):
+        self.end_animation()
+        self.show_path(path)
+
+    def end_animation(self):
+        self.button_cancel.hide()
+        self.set_controls_enabled(True)
+
+    def show_path(self, path, distances=None):
+        logger.info("Path of %d cells", len(path) if path else 0)
+        logger.debug("Path: %s", path)
         update_dots(self.maze_widget)
+        if distances is not None:
+            self.maze_widget.set_distances(distances)
         self.maze_widget.draw_path(path)
@@ -1,21 +1,52 @@
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 
 gl_logger = logging.getLogger(name=__name__)
 
-from PySide6.QtCore import QPoint
+import numpy as np
+from PySide6.QtCore import Qt, QPointF, QLineF, QRectF, QTimer
 from PySide6.QtGui import (
+    QColor,
+    QImage,
     QPainter,
-    QPen
+    QPen,
+    QPixmap,
+    QPolygonF,
+    QTransform
 )
 
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
 
 from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.maze_solver import WaveRun
+from .geometry import (
+    cell_index,
+    clamp_offset,
+    heat_levels,
+    heat_palette,
+    lod_level,
+    lod_window,
+    mark_cells,
+    mark_pyramid,
+    path_corners,
+    visible_range,
+    wall_density_pyramid,
+    wall_segments,
+    zoom_offset
+)
 from .config import (
     DEFAULT_CELL_SIZE,
     HEIGHT,
     WIDTH,
+    ZOOM_STEP,
+    MAX_CELL_PIXELS,
+    LOD_CELL_PIXELS,
+    WAVE_TIMER_MS,
+    WAVE_FRAME_MS,
+    GL_WAVE_COLOR,
+    GL_WAVE_FRONT_COLOR,
+    GL_HEAT_STOPS,
     GL_BACKGROUND_COLOR,
     GL_LINE_COLOR,
     GL_LINE_THICKNESS,
@@ -30,14 +61,47 @@ class MazeOpenGLWidget(QOpenGLWidget):
         self.file_open_flag = False
         self.rows = 0
         self.cols = 0
-        self.maze: List[List[Point]] = []
-        self.start_point: Optional[Point] = None
-        self.end_point: Optional[Point] = None
+        self.maze: MazeGrid = MazeGrid.empty(0, 0)
+        # Selected cells as (row, col), they stay on their cells while the view moves
+        self.start_point: Optional[Tuple[int, int]] = None
+        self.end_point: Optional[Tuple[int, int]] = None
         self.from_p = None
         self.to_p = None
-        self.cell_width = DEFAULT_CELL_SIZE
-        self.cell_height = DEFAULT_CELL_SIZE
         self.setFixedSize(WIDTH, HEIGHT)
+        self.setFocusPolicy(Qt.ClickFocus)
+
+        # View transform: cell (row, col) has its top left corner at
+        # (offset_x + col * cell_width, offset_y + row * cell_height)
+        self.fit_width = DEFAULT_CELL_SIZE
+        self.fit_height = DEFAULT_CELL_SIZE
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.pan_anchor: Optional[QPointF] = None
+
+        # Walls of the visible part of the maze rendered into a pixmap, repaints only blit
+        # the layer and draw the overlays on top of it. The density pyramid for the
+        # zoomed out raster is built once per maze on first use.
+        self.wall_layer: QPixmap | None = None
+        self.pyramid: List[np.ndarray] | None = None
+
+        # Solve animation: a timer advances the wave run by one time slice per frame.
+        # Reached cells are marked 1 and the newest wave 2 on every level of a mark pyramid.
+        self.wave_run: WaveRun | None = None
+        self.wave_done = None
+        self.wave_marks: List[np.ndarray] | None = None
+        self.wave_front: np.ndarray | None = None
+        self.wave_colors = [0, QColor(GL_WAVE_COLOR).rgba(), QColor(GL_WAVE_FRONT_COLOR).rgba()]
+        self.wave_timer = QTimer(self)
+        self.wave_timer.setInterval(WAVE_TIMER_MS)
+        self.wave_timer.timeout.connect(self.advance_wave)
+
+        # Distance heatmap drawn into the wall layer: palette indices per pyramid level and
+        # the QImage over each level, made on first use. The path is a polyline in cell units.
+        self.heat: List[np.ndarray] | None = None
+        self.heat_images: Dict[int, QImage] = {}
+        self.heat_colors = heat_palette(GL_HEAT_STOPS)
+        self.path_line: QPolygonF | None = None
 
         self.background_color = GL_BACKGROUND_COLOR
         self.line_color = GL_LINE_COLOR
@@ -49,100 +113,322 @@ class MazeOpenGLWidget(QOpenGLWidget):
         self.line_color = GL_LINE_COLOR
         self.point_color_start = GL_POINT_COLOR_START
         self.point_color_end = GL_POINT_COLOR_END
-        self.update()
+        self.invalidate_walls()
 
-    def set_maze_coordinates(self, rows: int, cols: int, maze: List[List[Point]]):
+    def set_maze_coordinates(self, rows: int, cols: int, maze: MazeGrid | List[List[Point]]):
         self.rows = rows
         self.cols = cols
-        self.maze = maze
+        self.maze = MazeGrid.coerce(maze)
+
+        self.fit_width = WIDTH / self.cols
+        self.fit_height = HEIGHT / self.rows
+
+        self.pyramid = None
+        self.clear_overlays()
+        self.fit_view()
+
+    @property
+    def cell_width(self) -> float:
+        return self.fit_width * self.zoom
+
+    @property
+    def cell_height(self) -> float:
+        return self.fit_height * self.zoom
+
+    def fit_view(self):
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.invalidate_walls()
+
+    def max_zoom(self) -> float:
+        return max(1.0, MAX_CELL_PIXELS / min(self.fit_width, self.fit_height))
+
+    def clamp_offset(self):
+        # The maze is never smaller than the widget, so keep it covering the whole view
+        self.offset_x = clamp_offset(self.offset_x, self.width(), self.cols * self.cell_width)
+        self.offset_y = clamp_offset(self.offset_y, self.height(), self.rows * self.cell_height)
+
+    def zoom_at(self, position: QPointF, factor: float):
+        zoom = min(self.max_zoom(), max(1.0, self.zoom * factor))
+        scale = zoom / self.zoom
+        self.offset_x = zoom_offset(position.x(), self.offset_x, scale)
+        self.offset_y = zoom_offset(position.y(), self.offset_y, scale)
+        self.zoom = zoom
+        self.clamp_offset()
+        self.invalidate_walls()
 
-        self.cell_width = WIDTH / self.cols
-        self.cell_height = HEIGHT / self.rows
+    def pan_by(self, dx: float, dy: float):
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp_offset()
+        self.invalidate_walls()
 
+    def cell_at(self, position: QPointF) -> Optional[Tuple[int, int]]:
+        # Inverse of the view transform, None outside of the maze
+        col = cell_index(position.x(), self.offset_x, self.cell_width, self.cols)
+        row = cell_index(position.y(), self.offset_y, self.cell_height, self.rows)
+        if row is None or col is None:
+            return None
+        return row, col
+
+    def cell_center(self, row: int, col: int) -> QPointF:
+        return QPointF(self.offset_x + (col + 0.5) * self.cell_width,
+                       self.offset_y + (row + 0.5) * self.cell_height)
+
+    def visible_cells(self) -> Tuple[int, int, int, int]:
+        row_start, row_stop = visible_range(self.offset_y, self.cell_height, self.height(), self.rows)
+        col_start, col_stop = visible_range(self.offset_x, self.cell_width, self.width(), self.cols)
+        return row_start, row_stop, col_start, col_stop
+
+    def invalidate_walls(self):
+        # Call after the maze walls, the colors, the view or the widget size change
+        self.wall_layer = None
         self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.fillRect(self.rect(), self.background_color)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.wall_layer = None
+
+    def build_wall_layer(self) -> QPixmap:
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(self.size() * ratio)
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(self.background_color)
+        painter = QPainter(layer)
+        if self.heat is not None:
+            self.render_heatmap(painter)
+        self.render_walls(painter)
+        painter.end()
+        return layer
+
+    def render_walls(self, painter: QPainter):
+        if self.rows == 0 or self.cols == 0:
+            return
+        w, h = self.cell_width, self.cell_height
+        if min(w, h) < LOD_CELL_PIXELS:
+            self.render_density(painter)
+        else:
+            self.render_segments(painter)
+
+        painter.setPen(QPen(self.line_color, GL_LINE_THICKNESS))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(QRectF(self.offset_x, self.offset_y, self.cols * w, self.rows * h))
+
+    def render_segments(self, painter: QPainter):
+        # Only the walls of visible cells are merged and drawn, so the cost follows the view, not the maze
+        row_start, row_stop, col_start, col_stop = self.visible_cells()
+        window = MazeGrid(self.maze.right[row_start:row_stop, col_start:col_stop],
+                          self.maze.bottom[row_start:row_stop, col_start:col_stop])
+        horizontal, vertical = wall_segments(window)
+        w, h = self.cell_width, self.cell_height
+        x0 = self.offset_x + col_start * w
+        y0 = self.offset_y + row_start * h
+        lines = [QLineF(x0 + start * w, y0 + (row + 1) * h, x0 + stop * w, y0 + (row + 1) * h)
+                 for row, start, stop in horizontal.tolist()]
+        lines += [QLineF(x0 + (col + 1) * w, y0 + start * h, x0 + (col + 1) * w, y0 + stop * h)
+                  for col, start, stop in vertical.tolist()]
+        if lines:
+            painter.setPen(QPen(self.line_color, GL_LINE_THICKNESS))
+            painter.drawLines(lines)
+
+    def lod_level(self, levels: int) -> int:
+        return lod_level(min(self.cell_width, self.cell_height), levels)
+
+    def lod_window(self, level: int) -> Tuple[int, int, int, int]:
+        return lod_window(*self.visible_cells(), level)
+
+    def draw_texels(self, painter: QPainter, image: QImage, level: int, row_start: int, col_start: int,
+                    smooth: bool):
+        step = 1 << level
+        w, h = self.cell_width * step, self.cell_height * step
+        painter.save()
+        painter.setClipRect(QRectF(self.offset_x, self.offset_y, self.cols * self.cell_width,
+                                   self.rows * self.cell_height))
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, smooth)
+        painter.drawImage(QRectF(self.offset_x + col_start * w, self.offset_y + row_start * h,
+                                 image.width() * w, image.height() * h), image)
+        painter.restore()
 
-        pen = QPen(self.line_color, GL_LINE_THICKNESS)
+    def render_density(self, painter: QPainter):
+        # Cells smaller than LOD_CELL_PIXELS: every texel of the chosen pyramid level
+        # covers at least one pixel and is shaded by the share of walls inside it
+        if self.pyramid is None:
+            self.pyramid = wall_density_pyramid(self.maze)
+        level = self.lod_level(len(self.pyramid))
+        row_start, row_stop, col_start, col_stop = self.lod_window(level)
+        density = self.pyramid[level][row_start:row_stop, col_start:col_stop]
+        if density.size == 0:
+            return
+
+        background = np.array(QColor(self.background_color).getRgb()[:3], dtype=np.float32)
+        line = np.array(QColor(self.line_color).getRgb()[:3], dtype=np.float32)
+        weight = density[..., None].astype(np.float32) / 254
+        pixels = np.ascontiguousarray(background + (line - background) * weight, dtype=np.uint8)
+        texels_y, texels_x = density.shape
+        image = QImage(pixels.data, texels_x, texels_y, 3 * texels_x, QImage.Format_RGB888)
+        self.draw_texels(painter, image, level, row_start, col_start, smooth=True)
+
+    def render_wave(self, painter: QPainter):
+        # Drawn on every repaint, the window is at most one texel per pixel whatever the maze size
+        level = self.lod_level(len(self.wave_marks))
+        row_start, row_stop, col_start, col_stop = self.lod_window(level)
+        marks = np.ascontiguousarray(self.wave_marks[level][row_start:row_stop, col_start:col_stop])
+        if marks.size == 0:
+            return
+        texels_y, texels_x = marks.shape
+        image = QImage(marks.data, texels_x, texels_y, texels_x, QImage.Format_Indexed8)
+        image.setColorTable(self.wave_colors)
+        self.draw_texels(painter, image, level, row_start, col_start, smooth=False)
+
+    def set_distances(self, distances: np.ndarray | None):
+        # A distance field of the current maze as from MazeSolverInterface.distance_field, None hides it
+        self.heat = None if distances is None else heat_levels(distances)
+        self.heat_images = {}
+        self.invalidate_walls()
+
+    def render_heatmap(self, painter: QPainter):
+        level = self.lod_level(len(self.heat))
+        row_start, row_stop, col_start, col_stop = self.lod_window(level)
+        if row_stop <= row_start or col_stop <= col_start:
+            return
+        image = self.heat_images.get(level)
+        if image is None:
+            texels = self.heat[level]
+            image = QImage(texels.data, texels.shape[1], texels.shape[0], texels.shape[1], QImage.Format_Indexed8)
+            image.setColorTable(self.heat_colors)
+            self.heat_images[level] = image
+        window = image.copy(col_start, row_start, col_stop - col_start, row_stop - row_start)
+        self.draw_texels(painter, window, level, row_start, col_start, smooth=False)
+
+    def render_path(self, painter: QPainter):
+        # The view transform maps the polyline, a cosmetic pen keeps its width in pixels
+        pen = QPen(GL_POINT_COLOR_END, GL_LINE_THICKNESS)
+        pen.setCosmetic(True)
+        painter.save()
+        painter.setTransform(QTransform(self.cell_width, 0, 0, self.cell_height, self.offset_x, self.offset_y))
         painter.setPen(pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPolyline(self.path_line)
+        painter.restore()
+
+    def clear_overlays(self):
+        self.clear_wave()
+        self.path_line = None
+        self.set_distances(None)
 
-        for r in range(self.rows):
-            for c in range(self.cols):
-                point = self.maze[r][c]
-                x = c * self.cell_width
-                y = r * self.cell_height
+    def start_wave(self, run: WaveRun, on_done=None):
+        # on_done is called with the path once the search is over
+        self.stop_wave()
+        self.wave_run = run
+        self.wave_done = on_done
+        self.wave_marks = mark_pyramid(self.rows, self.cols)
+        self.wave_front = None
+        self.wave_timer.start()
 
-                if point.right == 1:
-                    painter.drawLine(x + self.cell_width, y, x + self.cell_width, y + self.cell_height)
+    def advance_wave(self):
+        # Large waves arrive in pieces over several frames, the front is what this frame reached
+        reached = [cell for wave in self.wave_run.advance(WAVE_FRAME_MS / 1000) for cell in wave]
+        if reached:
+            if self.wave_front is not None:
+                mark_cells(self.wave_marks, self.wave_front, 1)
+            self.wave_front = np.array(reached, dtype=np.intp)
+            mark_cells(self.wave_marks, self.wave_front, 2)
+            self.update()
+        if self.wave_run.done:
+            path = self.wave_run.path
+            on_done = self.wave_done
+            self.stop_wave()
+            if on_done is not None:
+                on_done(path)
 
-                if point.bottom == 1:
-                    painter.drawLine(x, y + self.cell_height, x + self.cell_width, y + self.cell_height)
+    def stop_wave(self):
+        # The marks stay on screen until clear_wave()
+        self.wave_timer.stop()
+        self.wave_run = None
+        self.wave_done = None
 
-        painter.drawLine(0, 0, 0, self.rows * self.cell_height)
-        painter.drawLine(0, 0, self.cols * self.cell_width, 0)
-        painter.drawLine(self.cols * self.cell_width, 0, self.cols * self.cell_width,
-                         self.rows * self.cell_height)  # Right border
-        painter.drawLine(0, self.rows * self.cell_height, self.cols * self.cell_width,
-                         self.rows * self.cell_height)  # Bottom border
+    def clear_wave(self):
+        self.stop_wave()
+        self.wave_marks = None
+        self.wave_front = None
+        self.update()
+
+    def paintEvent(self, event):
+        if self.wall_layer is None:
+            self.wall_layer = self.build_wall_layer()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.wall_layer)
+        if self.wave_marks is not None:
+            self.render_wave(painter)
+        if self.path_line is not None:
+            self.render_path(painter)
 
+        radius = max(3, min(self.cell_width, self.cell_height) // 4)
         if self.start_point:
             painter.setPen(QPen(GL_POINT_COLOR_START, GL_LINE_THICKNESS))
             painter.setBrush(GL_POINT_COLOR_START)
-            radius = min(self.cell_width, self.cell_height) // 4
-            painter.drawEllipse(self.start_point, radius, radius)
+            painter.drawEllipse(self.cell_center(*self.start_point), radius, radius)
 
         if self.end_point:
             painter.setPen(QPen(GL_POINT_COLOR_END, GL_LINE_THICKNESS))
             painter.setBrush(GL_POINT_COLOR_END)
-            radius = min(self.cell_width, self.cell_height) // 4
-            painter.drawEllipse(self.end_point, radius, radius)
+            painter.drawEllipse(self.cell_center(*self.end_point), radius, radius)
 
     def mousePressEvent(self, event):
-        if self.file_open_flag:
-            x = event.position().x()
-            y = event.position().y()
-
-            cell_x = int(x // self.cell_width)
-            cell_y = int(y // self.cell_height)
-
-            center_x = int(cell_x * self.cell_width + self.cell_width / 2)
-            center_y = int(cell_y * self.cell_height + self.cell_height / 2)
-            center = QPoint(center_x, center_y)
-            gl_logger.info(f"{cell_x=}, {cell_y=}")
+        if event.button() in (Qt.RightButton, Qt.MiddleButton):
+            self.pan_anchor = event.position()
+            return
+        if self.file_open_flag and self.wave_run is None:
+            cell = self.cell_at(event.position())
+            if cell is None:
+                return
+            cell_y, cell_x = cell
+            gl_logger.info("cell_x=%d, cell_y=%d", cell_x, cell_y)
 
             if self.start_point is None:
-                self.start_point = center
+                self.clear_overlays()
+                self.start_point = cell
                 self.from_p = self.maze[cell_y][cell_x]
-                gl_logger.info(f"start: {self.start_point}")
+                gl_logger.info("start: %s", self.start_point)
             elif self.start_point is not None and self.end_point is None:
-                self.end_point = center
+                self.end_point = cell
                 self.to_p = self.maze[cell_y][cell_x]
-                gl_logger.info(f"end: {self.end_point}")
+                gl_logger.info("end: %s", self.end_point)
             else:
                 update_dots(self)
 
             self.update()
 
-    def draw_path(self, path: List[Tuple[int, int]]):
-        if not path or len(path) < 2:
+    def mouseMoveEvent(self, event):
+        if self.pan_anchor is None:
             return
+        position = event.position()
+        self.pan_by(position.x() - self.pan_anchor.x(), position.y() - self.pan_anchor.y())
+        self.pan_anchor = position
 
-        painter = QPainter(self)
-        painter.setPen(QPen(GL_POINT_COLOR_END, min(self.cell_width, self.cell_height)))
-        painter.setPen(QPen(GL_POINT_COLOR_END, GL_LINE_THICKNESS))
-        for i in range(len(path) - 1):
-            start_y, start_x = path[i]
-            end_y, end_x = path[i + 1]
-
-            painter.drawLine(
-                start_x * self.cell_width + self.cell_width / 2,
-                start_y * self.cell_height + self.cell_height / 2,
-                end_x * self.cell_width + self.cell_width / 2,
-                end_y * self.cell_height + self.cell_height / 2
-            )
-        painter.end()
+    def mouseReleaseEvent(self, event):
+        if event.button() in (Qt.RightButton, Qt.MiddleButton):
+            self.pan_anchor = None
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps and self.file_open_flag:
+            self.zoom_at(event.position(), ZOOM_STEP ** steps)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Home:
+            self.fit_view()
+        else:
+            super().keyPressEvent(event)
+
+    def draw_path(self, path: List[Tuple[int, int]]):
+        # Kept until the next start point or maze and drawn over the walls on every repaint
+        if not path or len(path) < 2:
+            self.path_line = None
+        else:
+            self.path_line = QPolygonF([QPointF(col + 0.5, row + 0.5) for row, col in path_corners(path).tolist()])
+        self.update()
 
 
 def update_dots(widget: MazeOpenGLWidget):
@@ -0,0 +1,131 @@
+import os
+import struct
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from interface.model.base_classes.maze_grid import MazeGrid
+from .maze_data import check_perfect, read_file, write_rows
+
+# Layout: 16 byte header, then the right and the bottom wall planes. Each plane holds
+# `rows` rows of ceil(cols / 8) bytes, walls are bit-packed little-endian inside a row.
+HEADER = struct.Struct("<4sHHII")
+MAGIC = b"MAZB"
+VERSION = 1
+BINARY_SUFFIX = ".maze"
+
+
+def row_bytes(cols: int) -> int:
+    return (cols + 7) // 8
+
+
+def pack_plane(plane: np.ndarray) -> np.ndarray:
+    return np.packbits(plane.astype(bool, copy=False), axis=1, bitorder="little")
+
+
+def unpack_plane(bits: np.ndarray, cols: int) -> np.ndarray:
+    return np.unpackbits(bits, axis=1, count=cols, bitorder="little")
+
+
+class MazeBinary:
+    """Binary maze file mapped into memory, opening it reads only the header."""
+
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{filename} is too short to be a binary maze")
+        magic, version, _, self.rows, self.cols = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a binary maze")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary maze version {version}")
+
+        self.row_bytes = row_bytes(self.cols)
+        plane_size = self.rows * self.row_bytes
+        expected = HEADER.size + 2 * plane_size
+        if os.path.getsize(filename) != expected:
+            raise ValueError(f"{filename} should be {expected} bytes long for a {self.rows}x{self.cols} maze")
+
+        if plane_size == 0:
+            self.right_bits = np.zeros((self.rows, self.row_bytes), dtype=np.uint8)
+            self.bottom_bits = np.zeros((self.rows, self.row_bytes), dtype=np.uint8)
+        else:
+            self.right_bits = np.memmap(filename, dtype=np.uint8, mode="r", offset=HEADER.size,
+                                        shape=(self.rows, self.row_bytes))
+            self.bottom_bits = np.memmap(filename, dtype=np.uint8, mode="r", offset=HEADER.size + plane_size,
+                                         shape=(self.rows, self.row_bytes))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.rows, self.cols
+
+    def read_rows(self, start: int, stop: int) -> MazeGrid:
+        return MazeGrid(unpack_plane(self.right_bits[start:stop], self.cols),
+                        unpack_plane(self.bottom_bits[start:stop], self.cols))
+
+    def iter_rows(self, chunk_rows: int = 1024) -> Iterator[Tuple[List[int], List[int]]]:
+        for start in range(0, self.rows, chunk_rows):
+            yield from self.read_rows(start, start + chunk_rows).iter_rows()
+
+    def to_grid(self) -> MazeGrid:
+        return self.read_rows(0, self.rows)
+
+
+def open_binary(filename) -> MazeBinary:
+    return MazeBinary(filename)
+
+
+def read_binary(filename, validate: bool = False) -> MazeGrid:
+    maze = MazeBinary(filename).to_grid()
+    return check_perfect(maze) if validate else maze
+
+
+def write_binary(filename, maze: MazeGrid):
+    maze = MazeGrid.coerce(maze)
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, maze.rows, maze.cols))
+        f.write(pack_plane(maze.right).tobytes())
+        f.write(pack_plane(maze.bottom).tobytes())
+
+
+def write_binary_rows(filename, rows: int, cols: int, rows_iter: Iterable[Tuple[List[int], List[int]]],
+                      chunk_rows: int = 1024):
+    # Planes have a fixed size, so rows are streamed into both of them with bounded memory
+    plane_offset = HEADER.size
+    plane_size = rows * row_bytes(cols)
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, rows, cols))
+        f.truncate(HEADER.size + 2 * plane_size)
+        written = 0
+        right_chunk, bottom_chunk = [], []
+
+        def flush():
+            f.seek(plane_offset + written * row_bytes(cols))
+            f.write(pack_plane(np.array(right_chunk, dtype=np.uint8).reshape(-1, cols)).tobytes())
+            f.seek(plane_offset + plane_size + written * row_bytes(cols))
+            f.write(pack_plane(np.array(bottom_chunk, dtype=np.uint8).reshape(-1, cols)).tobytes())
+
+        for right, bottom in rows_iter:
+            if written + len(right_chunk) >= rows:
+                raise ValueError(f"Expected {rows} rows, got more")
+            right_chunk.append(right)
+            bottom_chunk.append(bottom)
+            if len(right_chunk) >= chunk_rows:
+                flush()
+                written += len(right_chunk)
+                right_chunk, bottom_chunk = [], []
+        if right_chunk:
+            flush()
+            written += len(right_chunk)
+        if written != rows and plane_size > 0:
+            raise ValueError(f"Expected {rows} rows, got {written}")
+
+
+def text_to_binary(source, destination):
+    write_binary(destination, read_file(source))
+
+
+def binary_to_text(source, destination):
+    binary = MazeBinary(source)
+    write_rows(destination, binary.rows, binary.cols, binary.iter_rows())
@@ -0,0 +1,169 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import h5py
+import numpy as np
+
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.base_classes.point import Point
+from .maze_binary import pack_plane, row_bytes, unpack_plane
+
+CORPUS_FORMAT = "maze-corpus"
+CORPUS_VERSION = 1
+CORPUS_SUFFIX = ".h5"
+# Walls of all mazes follow each other in one byte dataset. Every maze row is stored as its
+# bit-packed right walls followed by its bit-packed bottom walls, so a range of rows is one slice.
+WALL_CHUNK_BYTES = 1 << 16
+INDEX_CHUNK_MAZES = 4096
+# Mazes buffered by extend() before they are written in one go
+FLUSH_MAZES = 1024
+NO_SEED = -1
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("rows", "<u4"), ("cols", "<u4"), ("seed", "<i8"),
+                        ("mode", h5py.string_dtype()), ("params", h5py.string_dtype())])
+
+
+class MazeCorpus:
+    """Many mazes in one HDF5 file, appended in order and read back by index.
+
+    Open with mode "r" to read and "a" to append, "w" starts a new corpus.
+    Every reader process opens the file on its own. A read-only corpus can be
+    pickled, the copy reopens the file, so it can be handed to a process pool.
+    """
+
+    def __init__(self, filename, mode: str = "r", compression: str | None = "gzip",
+                 compression_opts: int | None = 4):
+        self.filename = str(filename)
+        self.mode = mode
+        self.file = h5py.File(self.filename, mode)
+        if "walls" not in self.file:
+            if mode == "r":
+                self.file.close()
+                raise ValueError(f"{self.filename} is not a maze corpus")
+            self.file.attrs["format"] = CORPUS_FORMAT
+            self.file.attrs["version"] = CORPUS_VERSION
+            self.file.create_dataset("walls", shape=(0,), maxshape=(None,), dtype=np.uint8,
+                                     chunks=(WALL_CHUNK_BYTES,), compression=compression,
+                                     compression_opts=compression_opts)
+            self.file.create_dataset("index", shape=(0,), maxshape=(None,), dtype=INDEX_DTYPE,
+                                     chunks=(INDEX_CHUNK_MAZES,), compression=compression,
+                                     compression_opts=compression_opts)
+        elif self.file.attrs.get("format") != CORPUS_FORMAT:
+            self.file.close()
+            raise ValueError(f"{self.filename} is not a maze corpus")
+        elif (version := self.file.attrs.get("version")) != CORPUS_VERSION:
+            self.file.close()
+            raise ValueError(f"Unsupported maze corpus version {version}")
+        self.walls = self.file["walls"]
+        self.index = self.file["index"]
+        # Columns needed to locate a maze, kept in memory so lookups do not touch the file
+        self.offsets = self.index.fields("offset")[:]
+        self.rows = self.index.fields("rows")[:]
+        self.cols = self.index.fields("cols")[:]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> MazeGrid:
+        return self.read_rows(i, 0, int(self.rows[self.position(i)]))
+
+    def __iter__(self) -> Iterator[MazeGrid]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def position(self, i: int) -> int:
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"Maze {i} is out of range for a corpus of {len(self)}")
+        return i % len(self)
+
+    def shape(self, i: int) -> Tuple[int, int]:
+        i = self.position(i)
+        return int(self.rows[i]), int(self.cols[i])
+
+    def info(self, i: int) -> Dict[str, Any]:
+        # Dimensions, seed and generator parameters of maze i, the seed is None when it was not given
+        entry = self.index[self.position(i)]
+        mode = entry["mode"].decode() if isinstance(entry["mode"], bytes) else entry["mode"]
+        params = entry["params"].decode() if isinstance(entry["params"], bytes) else entry["params"]
+        return {"rows": int(entry["rows"]), "cols": int(entry["cols"]),
+                "seed": None if entry["seed"] == NO_SEED else int(entry["seed"]),
+                "mode": mode or None, "params": json.loads(params) if params else {}}
+
+    def read_rows(self, i: int, start: int, stop: int) -> MazeGrid:
+        # Rows [start, stop) of maze i, only the chunks holding them are read and decompressed
+        i = self.position(i)
+        rows, cols = int(self.rows[i]), int(self.cols[i])
+        start, stop = max(0, start), min(rows, stop)
+        stop = max(start, stop)
+        width = row_bytes(cols)
+        offset = int(self.offsets[i])
+        data = self.walls[offset + start * 2 * width:offset + stop * 2 * width].reshape(stop - start, 2 * width)
+        return MazeGrid(unpack_plane(data[:, :width], cols), unpack_plane(data[:, width:], cols))
+
+    def append(self, maze: MazeGrid | List[List[Point]], seed: int | None = None, mode: str | None = None,
+               **params) -> int:
+        # Returns the index of the new maze, params must be JSON serializable
+        return self.extend([(maze, seed, mode, params)])[0]
+
+    def extend(self, entries: Iterable[Tuple[MazeGrid, int | None, str | None, Dict[str, Any]]]) -> List[int]:
+        """Appends (maze, seed, mode, params) entries, returns their indices.
+
+        Entries are written FLUSH_MAZES at a time, so both datasets grow once
+        per batch instead of once per maze.
+        """
+        indices = []
+        batch = []
+        for maze, seed, mode, params in entries:
+            batch.append((MazeGrid.coerce(maze), seed, mode, params))
+            if len(batch) == FLUSH_MAZES:
+                indices += self.write_batch(batch)
+                batch = []
+        if batch:
+            indices += self.write_batch(batch)
+        return indices
+
+    def write_batch(self, batch: List[Tuple[MazeGrid, int | None, str | None, Dict[str, Any]]]) -> List[int]:
+        first = len(self)
+        offset = self.walls.shape[0]
+        blobs = []
+        entries = np.zeros(len(batch), dtype=INDEX_DTYPE)
+        for k, (maze, seed, mode, params) in enumerate(batch):
+            rows, cols = maze.shape
+            blob = np.concatenate([pack_plane(maze.right), pack_plane(maze.bottom)], axis=1).reshape(-1)
+            entries[k] = (offset, rows, cols, NO_SEED if seed is None else seed, mode or "",
+                          json.dumps(params) if params else "")
+            blobs.append(blob)
+            offset += blob.size
+        data = np.concatenate(blobs)
+        self.walls.resize((offset,))
+        if data.size:
+            self.walls[offset - data.size:offset] = data
+        self.index.resize((first + len(batch),))
+        self.index[first:] = entries
+        self.offsets = np.concatenate([self.offsets, entries["offset"]])
+        self.rows = np.concatenate([self.rows, entries["rows"]])
+        self.cols = np.concatenate([self.cols, entries["cols"]])
+        return list(range(first, first + len(batch)))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        if self.mode != "r":
+            raise TypeError("Only a read-only maze corpus can be pickled")
+        return {"filename": self.filename}
+
+    def __setstate__(self, state):
+        self.__init__(state["filename"])
+
+
+def open_corpus(filename, mode: str = "r") -> MazeCorpus:
+    return MazeCorpus(filename, mode)
@@ -1,25 +1,168 @@
 from dataclasses import dataclass, field
-from typing import List
-
-from interface.model.base_classes.point import Point
-
-def read_matrix(file, rows) -> List[List[int]]:
-    result = []
-    for _ in range(rows):
-        result.append([int(x) for x in file.readline().strip().split()])
-    return result
-
-def read_file(filename) -> List[List[Point]]:
-    maze = []
-    with open(filename, "r") as f:
-        rows, cols = tuple(int(x) for x in f.readline().split())
-        right = read_matrix(f, rows)
-        _ = f.readline()  # Skip empty line
-        bottom = read_matrix(f, rows)
-        for i in range(rows):
-            row = []
-            for j in range(cols):
-                temp_point = Point(right[i][j], bottom[i][j], f"{i},{j}", i, j)
-                row.append(temp_point)
-            maze.append(row)
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.maze_validator import validate_maze
+
+READ_CHUNK_SIZE = 1 << 20
+WRITE_CHUNK_ROWS = 1024
+
+ZERO, ONE, SPACE, TAB, NEWLINE, CARRIAGE_RETURN = b"0"[0], b"1"[0], b" "[0], b"\t"[0], b"\n"[0], b"\r"[0]
+
+class WallReader:
+    """Collects single digit walls from raw chunks of the text format.
+
+    Every chunk is scanned with a few vectorized passes. Digits are copied straight
+    into the output buffer, and the digits of every line are counted so that each
+    non-empty line can be checked to hold exactly `cols` walls.
+    """
+
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+        self.values = np.empty(2 * rows * cols, dtype=np.uint8)
+        self.filled = 0
+        self.lines = 0
+        self.line_digits = 0
+        self.last_is_digit = False
+
+    def feed(self, chunk: bytes):
+        buf = np.frombuffer(chunk, dtype=np.uint8)
+        is_digit = (buf == ZERO) | (buf == ONE)
+        if not np.all(is_digit | (buf == SPACE) | (buf == NEWLINE) | (buf == TAB) | (buf == CARRIAGE_RETURN)):
+            raise ValueError("Walls must be 0 or 1 separated by whitespace")
+        if np.any(is_digit[1:] & is_digit[:-1]) or (self.last_is_digit and is_digit[0]):
+            raise ValueError("Walls must be single digits separated by whitespace")
+        self.last_is_digit = bool(is_digit[-1])
+
+        digits = buf[is_digit]
+        if self.filled + digits.size > self.values.size:
+            raise ValueError(f"More walls than expected for a {self.rows}x{self.cols} maze")
+        np.subtract(digits, ZERO, out=self.values[self.filled:self.filled + digits.size])
+        self.filled += digits.size
+
+        newlines = np.flatnonzero(buf == NEWLINE)
+        if newlines.size == 0:
+            self.line_digits += digits.size
+            return
+        digits_before = np.cumsum(is_digit, dtype=np.int32)[newlines]
+        per_line = np.diff(digits_before, prepend=0)
+        per_line[0] += self.line_digits
+        self.line_digits = digits.size - int(digits_before[-1])
+        self.check_lines(per_line)
+
+    def check_lines(self, per_line: np.ndarray):
+        filled = per_line[per_line > 0]
+        if np.any(filled != self.cols):
+            raise ValueError(f"Every row must hold {self.cols} walls")
+        self.lines += filled.size
+
+    def finish(self) -> MazeGrid:
+        if self.line_digits:
+            self.check_lines(np.array([self.line_digits]))
+        if self.filled != self.values.size or self.lines != 2 * self.rows:
+            raise ValueError(f"Expected {2 * self.rows} rows of {self.cols} walls, "
+                             f"got {self.filled} walls in {self.lines} rows")
+        planes = self.values.reshape(2, self.rows, self.cols)
+        return MazeGrid(planes[0], planes[1])
+
+def check_perfect(maze: MazeGrid) -> MazeGrid:
+    report = validate_maze(maze)
+    if not report.perfect:
+        raise ValueError(report.summary())
     return maze
+
+def read_file(filename, chunk_size: int = READ_CHUNK_SIZE, validate: bool = False) -> MazeGrid:
+    # With `validate` a maze that is not perfect raises ValueError, see validate_maze()
+    with open(filename, "rb") as f:
+        header = f.readline().split()
+        if len(header) != 2:
+            raise ValueError("The first line must hold the number of rows and cols")
+        rows, cols = (int(x) for x in header)
+        if rows == 0 or cols == 0:
+            maze = MazeGrid.empty(rows, cols)
+        else:
+            reader = WallReader(rows, cols)
+            while chunk := f.read(chunk_size):
+                reader.feed(chunk)
+            maze = reader.finish()
+    return check_perfect(maze) if validate else maze
+
+
+def format_rows(plane: np.ndarray) -> bytes:
+    # Lays the walls out as "w w ... w\n" for all rows of the block at once
+    if plane.size and plane.max() > 1:
+        raise ValueError("Walls must be 0 or 1")
+    count, cols = plane.shape
+    lines = np.full((count, 2 * cols), SPACE, dtype=np.uint8)
+    lines[:, 0::2] = plane
+    lines[:, 0::2] += ZERO
+    lines[:, -1] = NEWLINE
+    return lines.tobytes()
+
+
+def write_file(filename, maze: MazeGrid, chunk_rows: int = WRITE_CHUNK_ROWS):
+    maze = MazeGrid.coerce(maze)
+    rows, cols = maze.shape
+    if cols == 0:
+        write_rows(filename, rows, cols, [])
+        return
+    with open(filename, "wb") as f:
+        f.write(f"{rows} {cols}\n".encode())
+        for start in range(0, rows, chunk_rows):
+            f.write(format_rows(maze.right[start:start + chunk_rows]))
+        f.write(b"\n")
+        for start in range(0, rows, chunk_rows):
+            f.write(format_rows(maze.bottom[start:start + chunk_rows]))
+
+
+def write_rows(filename, rows: int, cols: int, rows_iter: Iterable[Tuple[List[int], List[int]]],
+               chunk_rows: int = 256):
+    # Every line of the text format holds single digit walls, so it is exactly `width` bytes long
+    # and the bottom block starts at a known offset. That lets both blocks be written in one pass
+    # over the rows while only `chunk_rows` rows are buffered.
+    header = f"{rows} {cols}\n".encode()
+    if cols == 0:
+        with open(filename, "wb") as f:
+            f.write(header + b"\n" * (2 * rows + 1))
+        return
+    width = 2 * cols
+    bottom_offset = len(header) + rows * width + 1
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.seek(bottom_offset - 1)
+        f.write(b"\n")  # Empty line between the blocks
+
+        right_chunk, bottom_chunk = [], []
+        written = 0
+
+        def flush():
+            try:
+                right_block = np.array(right_chunk, dtype=np.uint8)
+                bottom_block = np.array(bottom_chunk, dtype=np.uint8)
+            except ValueError:
+                right_block = bottom_block = None
+            expected = (len(right_chunk), cols)
+            if right_block is None or right_block.shape != expected or bottom_block.shape != expected:
+                raise ValueError(f"Rows {written}..{written + len(right_chunk)} do not hold {cols} walls each")
+            f.seek(len(header) + written * width)
+            f.write(format_rows(right_block))
+            f.seek(bottom_offset + written * width)
+            f.write(format_rows(bottom_block))
+
+        for right, bottom in rows_iter:
+            if written + len(right_chunk) >= rows:
+                raise ValueError(f"Expected {rows} rows, got more")
+            right_chunk.append(right)
+            bottom_chunk.append(bottom)
+            if len(right_chunk) >= chunk_rows:
+                flush()
+                written += len(right_chunk)
+                right_chunk, bottom_chunk = [], []
+        if right_chunk:
+            flush()
+            written += len(right_chunk)
+        if written != rows:
+            raise ValueError(f"Expected {rows} rows, got {written}")
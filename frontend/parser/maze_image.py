@@ -0,0 +1,170 @@
+import struct
+import zlib
+from typing import BinaryIO, Iterator, List, Tuple
+
+import numpy as np
+
+from interface.model.base_classes.maze_grid import MazeGrid
+from .maze_binary import MazeBinary
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# 8-bit palette PNG: width, height, bit depth, color type 3, compression, filter, interlace
+IHDR = struct.Struct(">IIBBBBB")
+
+# Palette indices of the raster
+BACKGROUND, WALL, PATH = 0, 1, 2
+DEFAULT_PALETTE = [(255, 255, 255), (0, 0, 0), (255, 0, 0)]
+DEFAULT_CELL_PIXELS = 4
+# Tiles are whole maze rows holding at most about this many pixels
+TILE_PIXELS = 1 << 24
+
+
+def image_size(shape: Tuple[int, int], cell_size: int, wall_width: int) -> Tuple[int, int]:
+    # Every cell owns cell_size pixels including its right and bottom wall, plus the left and top border
+    rows, cols = shape
+    return cols * cell_size + wall_width, rows * cell_size + wall_width
+
+
+def path_steps(path: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Path cells, then the cells whose right and whose bottom passage the path goes through
+    cells = np.asarray(path, dtype=np.int64).reshape(-1, 2)
+    first = np.minimum(cells[:-1], cells[1:])
+    across = cells[:-1, 0] == cells[1:, 0]
+    return cells, first[across], first[~across]
+
+
+def rasterize_rows(right: np.ndarray, bottom: np.ndarray, cell_size: int, wall_width: int) -> np.ndarray:
+    """Palette indices of a band of maze rows, without the top border.
+
+    Walls are set by broadcasting the wall planes over a (rows, y, cols, x) view
+    of the pixels, so the work is a few array operations per band.
+    """
+    rows, cols = right.shape
+    inner = cell_size - wall_width
+    tile = np.zeros((rows, cell_size, cols * cell_size + wall_width), dtype=np.uint8)
+    tile[:, :, :wall_width] = WALL
+    cells = tile[:, :, wall_width:].reshape(rows, cell_size, cols, cell_size)
+    cells[:, :, :, inner:] |= right[:, None, :, None].astype(bool)
+    cells[:, inner:, :, :] |= bottom[:, None, :, None].astype(bool)
+    # Corner posts keep wall lines continuous where they meet
+    cells[:, inner:, :, inner:] = WALL
+    return tile
+
+
+def paint_path(tile: np.ndarray, start: int, steps: Tuple[np.ndarray, np.ndarray, np.ndarray], wall_width: int):
+    # Fills the path cells of rows [start, start + len(tile)) and the passages between them
+    rows, cell_size, width = tile.shape
+    cols = (width - wall_width) // cell_size
+    inner = cell_size - wall_width
+    cells = tile[:, :, wall_width:].reshape(rows, cell_size, cols, cell_size)
+    path, right, bottom = (part[(part[:, 0] >= start) & (part[:, 0] < start + rows)] for part in steps)
+    cells[path[:, 0] - start, :inner, path[:, 1], :inner] = PATH
+    cells[right[:, 0] - start, :inner, right[:, 1], inner:] = PATH
+    cells[bottom[:, 0] - start, inner:, bottom[:, 1], :inner] = PATH
+
+
+def iter_raster(maze: MazeGrid | MazeBinary, path: List[Tuple[int, int]] | None = None,
+                cell_size: int = DEFAULT_CELL_PIXELS, wall_width: int = 1) -> Iterator[np.ndarray]:
+    """Scanlines of a maze image as 2D arrays of palette indices, top to bottom.
+
+    A binary maze file is read band by band as well, so memory stays bounded by
+    TILE_PIXELS whatever the size of the maze.
+    """
+    if wall_width < 1 or cell_size <= wall_width:
+        raise ValueError(f"Cell size must be larger than the wall width, got {cell_size} and {wall_width}")
+    rows, cols = maze.shape
+    width, _ = image_size(maze.shape, cell_size, wall_width)
+    steps = path_steps(path) if path else None
+    band = max(1, TILE_PIXELS // (width * cell_size))
+
+    yield np.full((wall_width, width), WALL, dtype=np.uint8)
+    for start in range(0, rows, band):
+        stop = min(rows, start + band)
+        if isinstance(maze, MazeBinary):
+            window = maze.read_rows(start, stop)
+        else:
+            window = MazeGrid(maze.right[start:stop], maze.bottom[start:stop])
+        tile = rasterize_rows(window.right, window.bottom, cell_size, wall_width)
+        if steps is not None:
+            paint_path(tile, start, steps, wall_width)
+        yield tile.reshape(-1, width)
+
+
+def pack_pixels(pixels: np.ndarray, bit_depth: int) -> np.ndarray:
+    # Palette indices packed most significant bits first, as PNG stores pixels narrower than a byte
+    if bit_depth == 8:
+        return pixels
+    per_byte = 8 // bit_depth
+    width = pixels.shape[1]
+    padded = np.zeros((pixels.shape[0], -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = pixels
+    packed = np.zeros((pixels.shape[0], padded.shape[1] // per_byte), dtype=np.uint8)
+    for i in range(per_byte):
+        packed |= padded[:, i::per_byte] << (8 - bit_depth * (i + 1))
+    return packed
+
+
+class PngWriter:
+    """Palette PNG written band by band.
+
+    Every band of scanlines is compressed into the same zlib stream and flushed
+    as its own IDAT chunk, so only one band is ever held in memory. Pixels are
+    packed to the smallest bit depth the palette allows, which also leaves zlib
+    fewer bytes to compress.
+    """
+
+    def __init__(self, file: BinaryIO, width: int, height: int, palette: List[Tuple[int, int, int]],
+                 compress_level: int = 6):
+        self.file = file
+        self.bit_depth = next(depth for depth in (1, 2, 4, 8) if len(palette) <= 1 << depth)
+        self.compressor = zlib.compressobj(compress_level)
+        file.write(PNG_SIGNATURE)
+        self.chunk(b"IHDR", IHDR.pack(width, height, self.bit_depth, 3, 0, 0, 0))
+        self.chunk(b"PLTE", bytes(channel for color in palette for channel in color))
+
+    def chunk(self, kind: bytes, data: bytes):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, pixels: np.ndarray):
+        # Each scanline starts with filter type 0, the packed palette indices follow unchanged
+        packed = pack_pixels(pixels, self.bit_depth)
+        lines = np.zeros((packed.shape[0], packed.shape[1] + 1), dtype=np.uint8)
+        lines[:, 1:] = packed
+        data = self.compressor.compress(lines.tobytes())
+        if data:
+            self.chunk(b"IDAT", data)
+
+    def close(self):
+        self.chunk(b"IDAT", self.compressor.flush())
+        self.chunk(b"IEND", b"")
+
+
+def write_png(filename, maze: MazeGrid | MazeBinary, path: List[Tuple[int, int]] | None = None,
+              cell_size: int = DEFAULT_CELL_PIXELS, wall_width: int = 1,
+              palette: List[Tuple[int, int, int]] = DEFAULT_PALETTE, compress_level: int = 6) -> Tuple[int, int]:
+    # Returns the (width, height) of the image
+    width, height = image_size(maze.shape, cell_size, wall_width)
+    if not path:
+        # Only background and walls, one bit per pixel is enough
+        palette = palette[:PATH]
+    with open(filename, "wb") as f:
+        writer = PngWriter(f, width, height, palette, compress_level)
+        for pixels in iter_raster(maze, path, cell_size, wall_width):
+            writer.write_rows(pixels)
+        writer.close()
+    return width, height
+
+
+def maze_image(maze: MazeGrid | MazeBinary, path: List[Tuple[int, int]] | None = None,
+               cell_size: int = DEFAULT_CELL_PIXELS, wall_width: int = 1,
+               palette: List[Tuple[int, int, int]] = DEFAULT_PALETTE):
+    # Whole image in memory as a Pillow "P" image, meant for small mazes, write_png streams large ones
+    from PIL import Image
+
+    # putpalette turns the "L" image of palette indices into a "P" image
+    image = Image.fromarray(np.concatenate(list(iter_raster(maze, path, cell_size, wall_width))))
+    image.putpalette([channel for color in palette for channel in color])
+    return image
@@ -0,0 +1,147 @@
+from abc import abstractmethod
+from typing import Any, Callable
+import logging
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from interface.maze_interface import MazeInterface
+from interface.maze_solver_interface import MazeSolverInterface
+from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.maze_validator import MazeReport
+from interface.model.metrics import Metrics, phase
+
+worker_logger = logging.getLogger(name=__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobSignals(QObject):
+    # Created on the GUI thread, so slots connected to these run there as well
+    progress = Signal(int)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+
+class MazeJob(QRunnable):
+    """Work run on a QThreadPool that reports percent progress and can be cancelled.
+
+    Subclasses implement work() and call report() from their inner loop, which is
+    also where a pending cancel request interrupts the job.
+    """
+
+    def __init__(self, metrics: Metrics | None = None):
+        # Shiboken creates Qt objects without the abstract method check of ABCMeta, it is done here instead
+        if getattr(type(self).work, "__isabstractmethod__", False):
+            raise TypeError(f"{type(self).__name__} does not implement work()")
+        super().__init__()
+        self.metrics = metrics
+        # The window keeps the job until it is done, Qt must not delete it behind Python's back
+        self.setAutoDelete(False)
+        self.signals = JobSignals()
+        self.cancel_requested = False
+        self.percent = -1
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def report(self, done: int, total: int):
+        if self.cancel_requested:
+            raise JobCancelled()
+        percent = min(100, done * 100 // max(total, 1))
+        # Only changes are emitted, a wave loop may call this thousands of times per second
+        if percent != self.percent:
+            self.percent = percent
+            self.signals.progress.emit(percent)
+
+    @abstractmethod
+    def work(self) -> Any:
+        pass
+
+    def run(self):
+        try:
+            result = self.work()
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            worker_logger.exception("Background job failed")
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class GenerateJob(MazeJob):
+    def __init__(self, generator: MazeInterface, rows: int, cols: int, algorithm: str, seed=None,
+                 metrics: Metrics | None = None):
+        super().__init__(metrics)
+        self.generator = generator
+        self.rows = rows
+        self.cols = cols
+        self.algorithm = algorithm
+        self.seed = seed
+
+    def work(self) -> MazeGrid:
+        rows_iter = self.generator.iter_rows(self.rows, self.cols, self.algorithm, self.seed)
+        if self.metrics is not None:
+            rows_iter = self.metrics.track_rows(rows_iter)
+
+        def tracked_rows():
+            for done, row in enumerate(rows_iter, start=1):
+                yield row
+                self.report(done, self.rows)
+
+        if self.metrics is None:
+            return MazeGrid.from_rows(tracked_rows(), self.rows, self.cols)
+        with self.metrics.phase("generate"):
+            return MazeGrid.from_rows(tracked_rows(), self.rows, self.cols)
+
+
+class SolveJob(MazeJob):
+    def __init__(self, solver: MazeSolverInterface, from_: Point, to: Point, maze: MazeGrid,
+                 metrics: Metrics | None = None, distances: bool = False):
+        super().__init__(metrics)
+        self.solver = solver
+        self.from_ = from_
+        self.to = to
+        self.maze = maze
+        self.with_distances = distances
+        # Distance field from from_ when asked for, set before the path is emitted
+        self.distances: np.ndarray | None = None
+
+    def work(self):
+        total = self.maze.rows * self.maze.cols
+        progress = lambda expanded: self.report(expanded, total)
+        if self.with_distances:
+            # One flood of the whole maze gives both the field and the path
+            with phase(self.metrics, "distances"):
+                self.distances = self.solver.distance_field(self.from_, self.maze, progress)
+            return self.solver.path_in_field(self.distances, self.from_, self.to)
+        return self.solver.solve(self.from_, self.to, self.maze, progress=progress, metrics=self.metrics)
+
+
+class ValidateJob(MazeJob):
+    def __init__(self, solver: MazeSolverInterface, maze: MazeGrid, metrics: Metrics | None = None):
+        super().__init__(metrics)
+        self.solver = solver
+        self.maze = maze
+
+    def work(self) -> MazeReport:
+        # The validator runs as a few array passes without a loop to report from, a cancel applies once it is done
+        with phase(self.metrics, "validate"):
+            report = self.solver.validate(self.maze)
+        self.report(1, 1)
+        return report
+
+
+def connect_job(job: MazeJob, on_finished: Callable[[Any], None], on_progress: Callable[[int], None],
+                on_done: Callable[[], None]):
+    # on_done runs after any outcome, finished, failed or cancelled
+    job.signals.progress.connect(on_progress)
+    job.signals.finished.connect(on_finished)
+    job.signals.finished.connect(on_done)
+    job.signals.failed.connect(on_done)
+    job.signals.cancelled.connect(on_done)
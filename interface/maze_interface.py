@@ -1,10 +1,42 @@
 from interface.model.maze_generator import MazeGenerator
-from typing import List
+from interface.model.linear_maze_generator import LinearMazeGenerator
+from interface.model.parallel_maze_generator import ParallelMazeGenerator
+from interface.model.vector_maze_generator import BinaryTreeMazeGenerator, SidewinderMazeGenerator
+from interface.model.kruskal_maze_generator import KruskalMazeGenerator
+from interface.model.wilson_maze_generator import WilsonMazeGenerator
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.metrics import Metrics
+from typing import Iterator, List, Tuple
 
 
 class MazeInterface:
     def __init__(self):
         self.maze = MazeGenerator()
+        self.generators = {
+            "classic": self.maze,
+            "linear": LinearMazeGenerator(),
+            "parallel": ParallelMazeGenerator(),
+            "binary_tree": BinaryTreeMazeGenerator(),
+            "sidewinder": SidewinderMazeGenerator(),
+            "kruskal": KruskalMazeGenerator(),
+            "wilson": WilsonMazeGenerator(),
+        }
 
-    def generate_maze(self, rows, cols):
-        return self.maze.generate_maze(rows, cols)
+    def register(self, algorithm: str, generator: MazeGenerator):
+        # Any MazeGenerator subclass, generate_maze() and iter_rows() must return perfect mazes
+        self.generators[algorithm] = generator
+
+    def get_generator(self, algorithm: str, seed=None) -> MazeGenerator:
+        generator = self.generators.get(algorithm)
+        if generator is None:
+            raise ValueError(f"Unknown generation algorithm: {algorithm}")
+        if seed is not None:
+            generator.seed(seed)
+        return generator
+
+    def generate_maze(self, rows, cols, algorithm: str = "classic", seed=None,
+                      metrics: Metrics | None = None) -> MazeGrid:
+        return self.get_generator(algorithm, seed).generate_maze(rows, cols, metrics)
+
+    def iter_rows(self, rows, cols, algorithm: str = "classic", seed=None) -> Iterator[Tuple[List[int], List[int]]]:
+        return self.get_generator(algorithm, seed).iter_rows(rows, cols)
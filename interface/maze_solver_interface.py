@@ -1,13 +1,107 @@
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 
-from interface.model.maze_solver import MazeSolver
+import numpy as np
+
+from interface.model.maze_solver import MazeSolver, Progress, WaveRun
+from interface.model.vector_maze_solver import VectorMazeSolver
+from interface.model.maze_tree_index import MazeTreeIndex
+from interface.model.maze_validator import MazeReport, validate_maze
+from interface.model.batch_solver import BATCH_CHUNK_SIZE, Path, Query, solve_batch
 from interface.model.maze_generator import MazeGenerator
 from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.metrics import Metrics, phase
 
 class MazeSolverInterface:
-    def __init__(self):
-        self.maze_solver = MazeSolver()
+    def __init__(self, cache_size: int = 0):
+        self.maze_solver = MazeSolver(cache_size)
+        self.solvers = {
+            "python": self.maze_solver,
+            "numpy": VectorMazeSolver(),
+        }
+        self.expanded = 0
+        self.tree_index: MazeTreeIndex | None = None
+        self.tree_source = None
+        self.report: MazeReport | None = None
+        self.report_source = None
 
     def solve(self, start_position: Point, end_position: Point,
-              maze: List[List[Point]]) -> List[Tuple[int, int]] | None:
-        return self.maze_solver.solve(start_position, end_position, maze)
+              maze: MazeGrid | List[List[Point]], engine: str = "python",
+              strategy: str = "lee", progress: Progress | None = None,
+              metrics: Metrics | None = None) -> List[Tuple[int, int]] | None:
+        """Path from end to start, [] if there is none.
+
+        Once validate() was called with this very maze object, a pair in two
+        different components is answered with [] without a search. A copy or a
+        maze passed as List[List[Point]] is never matched to the report.
+        """
+        if self.report_source is maze and not self.report.connected(start_position, end_position):
+            # Different components of a validated maze, no search can reach the end
+            self.expanded = 0
+            return []
+        if engine == "tree":
+            with phase(metrics, "index"):
+                index = self.build_index(maze)
+            with phase(metrics, "path"):
+                path = index.path(start_position, end_position)
+            # No search runs, the path is read off the index
+            self.expanded = 0
+            if metrics is not None:
+                metrics.count("solves")
+                metrics.count("path_length", len(path) - 1)
+            return path
+        solver = self.solvers.get(engine)
+        if solver is None:
+            raise ValueError(f"Unknown solver engine: {engine}")
+        path = solver.solve(start_position, end_position, maze, strategy, progress, metrics)
+        self.expanded = solver.expanded
+        return path
+
+    def solve_batch(self, pairs: Iterable[Tuple[Point, Point] | Query], maze: MazeGrid | List[List[Point]],
+                    engine: str = "python", strategy: str = "lee", workers: int | None = None,
+                    chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[Path]:
+        # Results stream back in the order of `pairs`, the maze is shared with the workers once
+        return solve_batch(pairs, maze, engine, strategy, workers, chunk_size, self.maze_solver.cache_size)
+
+    def distance_field(self, start_position: Point, maze: MazeGrid | List[List[Point]],
+                       progress: Progress | None = None) -> np.ndarray:
+        # Distances from the start to every cell, -1 where unreachable, flooded by the numpy engine
+        solver = self.solvers["numpy"]
+        solver.load(maze)
+        solver.expanded = 0
+        return solver.distance_field(start_position, progress)
+
+    def path_in_field(self, field: np.ndarray, start_position: Point, end_position: Point) -> List[Tuple[int, int]]:
+        # Path of solve() read off a field from distance_field() on the same maze, without another search
+        return self.solvers["numpy"].path_in_field(field, start_position, end_position)
+
+    def wave_run(self, start_position: Point, end_position: Point,
+                 maze: MazeGrid | List[List[Point]]) -> WaveRun:
+        # A solver of its own, so a pool job may keep using maze_solver meanwhile
+        return WaveRun(MazeSolver().iter_wave(start_position, end_position, maze))
+
+    def build_index(self, maze: MazeGrid | List[List[Point]]) -> MazeTreeIndex:
+        # The index is built once per maze object, call again after editing walls in place
+        if self.tree_index is None or self.tree_source is not maze:
+            self.tree_index = MazeTreeIndex(maze)
+            self.tree_source = maze
+        return self.tree_index
+
+    def validate(self, maze: MazeGrid | List[List[Point]]) -> MazeReport:
+        # Kept for this maze object like the tree index, solve() then rejects unreachable pairs in O(1)
+        if self.report is None or self.report_source is not maze:
+            self.report = validate_maze(maze)
+            self.report_source = maze
+        return self.report
+
+    def reset_index(self):
+        self.tree_index = None
+        self.tree_source = None
+
+    def invalidate(self):
+        # Called whenever the current maze is replaced or its walls are edited in place
+        for solver in self.solvers.values():
+            solver.clear_cache()
+        self.reset_index()
+        self.report = None
+        self.report_source = None
@@ -0,0 +1,172 @@
+import hashlib
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from interface.model.base_classes.point import Point
+
+
+class CellView:
+    """Point-compatible view of a single MazeGrid cell, reads and writes go to the wall arrays."""
+    __slots__ = ("grid", "x", "y")
+
+    def __init__(self, grid: 'MazeGrid', x: int, y: int):
+        self.grid = grid
+        self.x = x
+        self.y = y
+
+    @property
+    def tag(self) -> str:
+        return f"{self.x},{self.y}"
+
+    @property
+    def right(self) -> int:
+        return int(self.grid.right[self.x, self.y])
+
+    @right.setter
+    def right(self, value: int):
+        self.grid.right[self.x, self.y] = value
+
+    @property
+    def bottom(self) -> int:
+        return int(self.grid.bottom[self.x, self.y])
+
+    @bottom.setter
+    def bottom(self, value: int):
+        self.grid.bottom[self.x, self.y] = value
+
+    def __repr__(self) -> str:
+        return f"CellView(x={self.x}, y={self.y}, right={self.right}, bottom={self.bottom})"
+
+
+class RowView(Sequence):
+    __slots__ = ("grid", "x")
+
+    def __init__(self, grid: 'MazeGrid', x: int):
+        self.grid = grid
+        self.x = x
+
+    def __len__(self) -> int:
+        return self.grid.cols
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CellView(self.grid, self.x, j) for j in range(*index.indices(self.grid.cols))]
+        if index < 0:
+            index += self.grid.cols
+        if not 0 <= index < self.grid.cols:
+            raise IndexError("column index out of range")
+        return CellView(self.grid, self.x, index)
+
+
+class MazeGrid:
+    """Maze stored as two contiguous uint8 wall planes of shape (rows, cols).
+
+    Indexing as maze[row][col] yields CellView objects, so code written against
+    List[List[Point]] keeps working on top of the arrays.
+    """
+    __slots__ = ("right", "bottom")
+
+    def __init__(self, right, bottom):
+        self.right = np.ascontiguousarray(right, dtype=np.uint8)
+        self.bottom = np.ascontiguousarray(bottom, dtype=np.uint8)
+        if self.right.ndim != 2 or self.right.shape != self.bottom.shape:
+            raise ValueError(f"wall planes must be 2D and of equal shape, "
+                             f"got {self.right.shape} and {self.bottom.shape}")
+
+    @classmethod
+    def empty(cls, rows: int, cols: int) -> 'MazeGrid':
+        return cls(np.zeros((rows, cols), dtype=np.uint8), np.zeros((rows, cols), dtype=np.uint8))
+
+    @classmethod
+    def from_points(cls, maze) -> 'MazeGrid':
+        rows = len(maze)
+        cols = len(maze[0]) if rows > 0 else 0
+        grid = cls.empty(rows, cols)
+        for i, row in enumerate(maze):
+            grid.right[i] = [point.right for point in row]
+            grid.bottom[i] = [point.bottom for point in row]
+        return grid
+
+    @classmethod
+    def from_rows(cls, rows_iter: Iterable[Tuple[List[int], List[int]]], rows: int, cols: int) -> 'MazeGrid':
+        grid = cls.empty(rows, cols)
+        count = 0
+        for count, (right, bottom) in enumerate(rows_iter, start=1):
+            if count > rows:
+                raise ValueError(f"Expected {rows} rows, got more")
+            grid.right[count - 1] = right
+            grid.bottom[count - 1] = bottom
+        if count != rows and rows * cols > 0:
+            raise ValueError(f"Expected {rows} rows, got {count}")
+        return grid
+
+    @classmethod
+    def coerce(cls, maze) -> 'MazeGrid':
+        if isinstance(maze, cls):
+            return maze
+        return cls.from_points(maze)
+
+    @property
+    def rows(self) -> int:
+        return self.right.shape[0]
+
+    @property
+    def cols(self) -> int:
+        return self.right.shape[1]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.right.shape
+
+    def cell(self, x: int, y: int) -> CellView:
+        return CellView(self, x, y)
+
+    def copy(self) -> 'MazeGrid':
+        return MazeGrid(self.right.copy(), self.bottom.copy())
+
+    def fingerprint(self) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.rows}x{self.cols}".encode())
+        digest.update(self.right.data)
+        digest.update(self.bottom.data)
+        return digest.digest()
+
+    def iter_rows(self) -> Iterator[Tuple[List[int], List[int]]]:
+        for right, bottom in zip(self.right, self.bottom):
+            yield right.tolist(), bottom.tolist()
+
+    def to_points(self) -> List[List[Point]]:
+        right = self.right.tolist()
+        bottom = self.bottom.tolist()
+        return [[Point(right[i][j], bottom[i][j], f"{i},{j}", i, j) for j in range(self.cols)]
+                for i in range(self.rows)]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RowView(self, i) for i in range(*index.indices(self.rows))]
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("row index out of range")
+        return RowView(self, index)
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield RowView(self, i)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MazeGrid):
+            return NotImplemented
+        return (self.shape == other.shape
+                and np.array_equal(self.right, other.right)
+                and np.array_equal(self.bottom, other.bottom))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MazeGrid(rows={self.rows}, cols={self.cols})"
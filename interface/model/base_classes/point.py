@@ -1,7 +1,9 @@
 class Point:
+    __slots__ = ("tag", "right", "bottom", "x", "y")
+
     def __init__(self, right, bottom, tag, x, y):
         self.tag = tag
         self.right = right
         self.bottom = bottom
         self.x = x
-        self.y = y
\ No newline at end of file
+        self.y = y
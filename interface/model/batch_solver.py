@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from interface.model.maze_solver import MazeSolver
+from interface.model.vector_maze_solver import VectorMazeSolver
+from interface.model.maze_tree_index import MazeTreeIndex
+from interface.model.maze_validator import validate_maze
+from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+
+BATCH_CHUNK_SIZE = 256
+ENGINES = ("python", "numpy", "tree")
+
+# (from_row, from_col, to_row, to_col), plain ints are all that is pickled per query
+Query = Tuple[int, int, int, int]
+Path = List[Tuple[int, int]] | None
+
+# Per-process state of the pool workers, filled once by init_worker
+worker_memory: shared_memory.SharedMemory | None = None
+worker_solve: Callable[[Query], Path] | None = None
+
+
+class SharedMaze:
+    """Both wall planes of a maze copied once into a shared memory block.
+
+    Workers attach to the block by name and wrap it in a MazeGrid without copying.
+    The creator owns the block: use it as a context manager or call close().
+    """
+
+    def __init__(self, maze: MazeGrid | List[List[Point]]):
+        maze = MazeGrid.coerce(maze)
+        self.rows, self.cols = maze.shape
+        self.memory = shared_memory.SharedMemory(create=True, size=max(1, 2 * self.rows * self.cols))
+        planes = shared_planes(self.memory, self.rows, self.cols)
+        planes[0] = maze.right
+        planes[1] = maze.bottom
+        del planes
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def shared_planes(memory: shared_memory.SharedMemory, rows: int, cols: int) -> np.ndarray:
+    return np.ndarray((2, rows, cols), dtype=np.uint8, buffer=memory.buf)
+
+
+def check_job(maze: MazeGrid, engine: str, strategy: str):
+    # Runs before any worker starts, an error raised in a pool initializer only surfaces as BrokenProcessPool
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown solver engine: {engine}")
+    if engine == "tree":
+        report = validate_maze(maze)
+        if not report.perfect:
+            raise ValueError(f"The tree engine needs a perfect maze, {report.summary()}")
+        return
+    strategies = VectorMazeSolver.STRATEGIES if engine == "numpy" else MazeSolver.STRATEGIES
+    if strategy not in strategies:
+        raise ValueError(f"Search strategy {strategy} is not supported by the {engine} engine")
+
+
+def make_solve(maze: MazeGrid, engine: str, strategy: str, cache_size: int) -> Callable[[Query], Path]:
+    # The maze is loaded or indexed once, every query afterwards only searches. check_job() has passed.
+    if engine == "tree":
+        index = MazeTreeIndex(maze)
+        return lambda query: index.path(Point(0, 0, None, query[0], query[1]), Point(0, 0, None, query[2], query[3]))
+    solver = VectorMazeSolver() if engine == "numpy" else MazeSolver(cache_size)
+    solver.load(maze)
+    return lambda query: solver.solve_loaded(Point(0, 0, None, query[0], query[1]),
+                                             Point(0, 0, None, query[2], query[3]), strategy)
+
+
+def init_worker(name: str, rows: int, cols: int, engine: str, strategy: str, cache_size: int):
+    global worker_memory, worker_solve
+    # Pool workers share the creator's resource tracker, so attaching does not make them owners
+    worker_memory = shared_memory.SharedMemory(name=name)
+    planes = shared_planes(worker_memory, rows, cols)
+    worker_solve = make_solve(MazeGrid(planes[0], planes[1]), engine, strategy, cache_size)
+
+
+def solve_chunk(queries: List[Query]) -> List[Path]:
+    return [worker_solve(query) for query in queries]
+
+
+def chunked(queries: Iterable[Query], size: int) -> Iterator[List[Query]]:
+    chunk = []
+    for query in queries:
+        chunk.append(query)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def as_query(pair: Tuple[Point, Point] | Query) -> Query:
+    if len(pair) == 4:
+        return tuple(int(x) for x in pair)
+    from_, to = pair
+    return from_.x, from_.y, to.x, to.y
+
+
+def solve_batch(pairs: Iterable[Tuple[Point, Point] | Query], maze: MazeGrid | List[List[Point]],
+                engine: str = "python", strategy: str = "lee", workers: int | None = None,
+                chunk_size: int = BATCH_CHUNK_SIZE, cache_size: int = 0) -> Iterator[Path]:
+    """Paths for many (start, end) pairs on one maze, yielded in submission order.
+
+    Pairs are (Point, Point) or (from_row, from_col, to_row, to_col). The maze is
+    placed in shared memory once and the pairs are spread over worker processes
+    in chunks of `chunk_size`. With workers=1 everything runs in this process.
+    """
+    maze = MazeGrid.coerce(maze)
+    check_job(maze, engine, strategy)
+    queries = map(as_query, pairs)
+    if workers == 1:
+        solve = make_solve(maze, engine, strategy, cache_size)
+        for query in queries:
+            yield solve(query)
+        return
+
+    with SharedMaze(maze) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(shared.name, shared.rows, shared.cols, engine, strategy,
+                                           cache_size)) as executor:
+            for paths in executor.map(solve_chunk, chunked(queries, chunk_size)):
+                yield from paths
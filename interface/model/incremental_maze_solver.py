@@ -0,0 +1,192 @@
+import heapq
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+
+from interface.model.maze_solver import MazeSolver
+from interface.model.vector_maze_solver import VectorMazeSolver
+from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+
+SIDES = ("right", "bottom")
+# A repair touching more than 1 / FULL_REPAIR_FRACTION of the cells gives up and floods the
+# whole field again, the vectorized flood is cheaper per cell than the repair
+FULL_REPAIR_FRACTION = 8
+
+
+class IncrementalMazeSolver(MazeSolver):
+    """Distance field from one source that is repaired after every wall edit.
+
+    Opening a wall can only shorten distances, they are lowered by a BFS from the
+    cell that got closer. Closing a wall can only lengthen the distances of cells
+    whose every shortest path used it. Those cells are collected level by level,
+    then settled again from their unaffected neighbours. Either way only the
+    changed part of the field is visited, unless it grows past a fraction of the
+    maze and a full flood is cheaper. Edits are written to the loaded maze.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.source_cell: Tuple[int, int] | None = None
+        # Flat row-major distances from the source, -1 for unreachable cells
+        self.distances: List[int] = []
+        # Cells whose distance was recomputed by the last edit
+        self.repaired: int = 0
+
+    def load(self, maze: MazeGrid | List[List[Point]]):
+        super().load(maze)
+        # Mutable copies, edits go to these and to the maze planes alike
+        self.right = bytearray(self.right)
+        self.bottom = bytearray(self.bottom)
+        self.source_cell = None
+        self.distances = []
+
+    def start(self, maze: MazeGrid | List[List[Point]], from_: Point):
+        self.load(maze)
+        self.set_source(from_)
+
+    def set_source(self, from_: Point):
+        flood = VectorMazeSolver()
+        flood.load(self.maze)
+        self.distances = flood.flood(from_).reshape(-1).tolist()
+        self.source_cell = (from_.x, from_.y)
+        self.repaired = self.rows * self.cols
+
+    def repair_limit(self) -> int:
+        return max(64, self.rows * self.cols // FULL_REPAIR_FRACTION)
+
+    def flood_again(self):
+        self.set_source(Point(0, 0, None, *self.source_cell))
+
+    def distance_field(self, from_: Point | None = None) -> np.ndarray:
+        if from_ is not None and (from_.x, from_.y) != self.source_cell:
+            self.set_source(from_)
+        return np.array(self.distances, dtype=np.int32).reshape(self.rows, self.cols)
+
+    def path_to(self, to: Point) -> List[Tuple[int, int]]:
+        # Same tie-breaking as make_path, so the path equals a fresh solve() on the edited maze
+        cols = self.cols
+        distances = self.distances
+        cell = to.x * cols + to.y
+        if distances[cell] == -1:
+            return []
+        path = [(to.x, to.y)]
+        while distances[cell] != 0:
+            row, col = divmod(cell, cols)
+            step = distances[cell] - 1
+            if col > 0 and distances[cell - 1] == step and self.right[cell - 1] == 0:
+                cell -= 1
+            elif col + 1 < cols and distances[cell + 1] == step and self.right[cell] == 0:
+                cell += 1
+            elif row > 0 and distances[cell - cols] == step and self.bottom[cell - cols] == 0:
+                cell -= cols
+            else:
+                cell += cols
+            path.append(divmod(cell, cols))
+        return path
+
+    def edge(self, row: int, col: int, side: str) -> Tuple[int, int]:
+        if side not in SIDES:
+            raise ValueError(f"Wall side must be one of {SIDES}, got {side}")
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Cell ({row}, {col}) is outside of a {self.rows}x{self.cols} maze")
+        if side == "right" and col == self.cols - 1 or side == "bottom" and row == self.rows - 1:
+            raise ValueError("Walls on the border of the maze cannot be edited")
+        cell = row * self.cols + col
+        return cell, cell + 1 if side == "right" else cell + self.cols
+
+    def set_wall(self, row: int, col: int, side: str, closed: bool):
+        if self.source_cell is None:
+            raise ValueError("Call start() before editing walls")
+        a, b = self.edge(row, col, side)
+        walls = self.right if side == "right" else self.bottom
+        plane = self.maze.right if side == "right" else self.maze.bottom
+        if walls[a] == int(closed):
+            self.repaired = 0
+            return
+        walls[a] = int(closed)
+        plane[row, col] = int(closed)
+        self.maze_key = None
+        if closed:
+            self.remove_edge(a, b)
+        else:
+            self.add_edge(a, b)
+
+    def toggle_wall(self, row: int, col: int, side: str) -> bool:
+        a, _ = self.edge(row, col, side)
+        closed = not (self.right if side == "right" else self.bottom)[a]
+        self.set_wall(row, col, side, closed)
+        return closed
+
+    def add_edge(self, a: int, b: int):
+        distances = self.distances
+        if distances[a] == -1 or (distances[b] != -1 and distances[b] < distances[a]):
+            a, b = b, a
+        self.repaired = 0
+        if distances[a] == -1 or (distances[b] != -1 and distances[b] <= distances[a] + 1):
+            return
+        distances[b] = distances[a] + 1
+        queue = deque([b])
+        limit = self.repair_limit()
+        while queue:
+            cell = queue.popleft()
+            self.repaired += 1
+            if self.repaired > limit:
+                self.flood_again()
+                return
+            closer = distances[cell] + 1
+            for neighbour in self.neighbours(cell):
+                if distances[neighbour] == -1 or distances[neighbour] > closer:
+                    distances[neighbour] = closer
+                    queue.append(neighbour)
+
+    def has_parent(self, cell: int, excluded: set) -> bool:
+        step = self.distances[cell] - 1
+        return any(self.distances[neighbour] == step and neighbour not in excluded
+                   for neighbour in self.neighbours(cell))
+
+    def remove_edge(self, a: int, b: int):
+        distances = self.distances
+        self.repaired = 0
+        if distances[a] == -1 or abs(distances[a] - distances[b]) != 1:
+            return
+        if distances[a] > distances[b]:
+            a, b = b, a
+        if self.has_parent(b, set()):
+            return
+
+        # Cells that lost every shortest path, in order of their old distance
+        affected = {b}
+        queue = deque([b])
+        limit = self.repair_limit()
+        while queue:
+            if len(affected) > limit:
+                self.flood_again()
+                return
+            cell = queue.popleft()
+            farther = distances[cell] + 1
+            for neighbour in self.neighbours(cell):
+                if (distances[neighbour] == farther and neighbour not in affected
+                        and not self.has_parent(neighbour, affected)):
+                    affected.add(neighbour)
+                    queue.append(neighbour)
+
+        for cell in affected:
+            distances[cell] = -1
+        heap = []
+        for cell in affected:
+            best = min((distances[neighbour] for neighbour in self.neighbours(cell)
+                        if distances[neighbour] != -1), default=-1)
+            if best != -1:
+                heap.append((best + 1, cell))
+        heapq.heapify(heap)
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distances[cell] != -1:
+                continue
+            distances[cell] = distance
+            for neighbour in self.neighbours(cell):
+                if neighbour in affected and distances[neighbour] == -1:
+                    heapq.heappush(heap, (distance + 1, neighbour))
+        self.repaired = len(affected)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from interface.model.vector_maze_generator import GridMazeGenerator
+from interface.model.maze_validator import union_find
+
+
+class KruskalMazeGenerator(GridMazeGenerator):
+    """Randomized Kruskal: the spanning tree of the grid that takes walls in a random order.
+
+    Kruskal on a random order gives the minimum spanning tree of those ranks,
+    which is found here with Borůvka rounds over whole arrays: every component
+    takes its lowest ranked outgoing passage, then the components joined by them
+    are merged with the bulk union-find of the validator. Each round at least
+    halves the number of components.
+    """
+
+    def carve(self, right: np.ndarray, bottom: np.ndarray, rng: np.random.Generator):
+        rows, cols = right.shape
+        size = rows * cols
+        cells = np.arange(size, dtype=np.int32).reshape(rows, cols)
+        across = cells[:, :-1].reshape(-1)
+        down = cells[:-1, :].reshape(-1)
+        # Walls 0.. are right walls, the rest bottom walls
+        a = np.concatenate([across, down])
+        b = np.concatenate([across + 1, down + cols])
+        rank = rng.permutation(a.size).astype(np.int32)
+        wall = np.arange(a.size, dtype=np.int32)
+        component = np.arange(size, dtype=np.int32)
+        opened = []
+        while True:
+            root_a = component[a]
+            root_b = component[b]
+            split = root_a != root_b
+            if not split.any():
+                break
+            a, b, rank, wall = a[split], b[split], rank[split], wall[split]
+            root_a, root_b = root_a[split], root_b[split]
+            lowest = np.full(size, np.iinfo(np.int32).max, dtype=np.int32)
+            np.minimum.at(lowest, root_a, rank)
+            np.minimum.at(lowest, root_b, rank)
+            chosen = (lowest[root_a] == rank) | (lowest[root_b] == rank)
+            opened.append(wall[chosen])
+            component = union_find(component, root_a[chosen], root_b[chosen])
+        opened = np.concatenate(opened) if opened else np.zeros(0, dtype=np.int32)
+        right.reshape(-1)[across[opened[opened < across.size]]] = 0
+        bottom.reshape(-1)[down[opened[opened >= across.size] - across.size]] = 0
@@ -0,0 +1,107 @@
+from typing import Iterator, List, Tuple
+
+from interface.model.maze_generator import MazeGenerator
+
+
+class LinearMazeGenerator(MazeGenerator):
+    """Eller's algorithm with a row-local disjoint-set instead of tag scans.
+
+    Sets are tracked as a union-find over the columns of the current row together
+    with per-set counters of cells that still have an open bottom, so a row costs
+    amortized O(cols). Random decisions are drawn in the same order as in
+    MazeGenerator, so both produce the same maze from the same seed.
+    """
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.parent: List[int] = []
+        self.size: List[int] = []
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def reset_row(self, cols: int):
+        self.parent = list(range(cols))
+        self.size = [1] * cols
+
+    def carry_row(self, bottom: List[int]):
+        # Cells under a bottom wall start a new set, the rest keep the set of the cell above
+        cols = len(bottom)
+        parent = list(range(cols))
+        size = [1] * cols
+        first = {}
+        for j in range(cols):
+            if bottom[j]:
+                continue
+            root = self.find(j)
+            if root in first:
+                parent[j] = first[root]
+                size[first[root]] += 1
+            else:
+                first[root] = j
+        self.parent = parent
+        self.size = size
+
+    def linear_right_wall(self, right: List[int]):
+        cols = len(right)
+        coins = self.random.coins(cols - 1)
+        for i in range(cols - 1):
+            a = self.find(i)
+            b = self.find(i + 1)
+            if a == b or coins[i]:
+                right[i] = 1
+            else:
+                right[i] = 0
+                self.union(a, b)
+        right[cols - 1] = 1
+
+    def linear_bottom_wall(self, bottom: List[int]):
+        open_cells = {}
+        coins = self.random.coins(len(bottom))
+        for i in range(len(bottom)):
+            root = self.find(i)
+            if root not in open_cells:
+                open_cells[root] = self.size[root]
+            if coins[i] and open_cells[root] > 1:
+                bottom[i] = 1
+                open_cells[root] -= 1
+            else:
+                bottom[i] = 0
+
+    def linear_last_row(self, right: List[int], bottom: List[int]):
+        self.linear_right_wall(right)
+        cols = len(right)
+        for i in range(cols - 1):
+            bottom[i] = 1
+            a = self.find(i)
+            b = self.find(i + 1)
+            if a != b and right[i] == 1:
+                right[i] = 0
+                self.union(a, b)
+        bottom[cols - 1] = 1
+
+    def iter_rows(self, rows: int, cols: int) -> Iterator[Tuple[List[int], List[int]]]:
+        if rows <= 0 or cols <= 0:
+            return
+        self.reset_row(cols)
+        for _ in range(rows - 1):
+            right = [0] * cols
+            bottom = [0] * cols
+            self.linear_right_wall(right)
+            self.linear_bottom_wall(bottom)
+            yield right, bottom
+            self.carry_row(bottom)
+        right = [0] * cols
+        bottom = [0] * cols
+        self.linear_last_row(right, bottom)
+        yield right, bottom
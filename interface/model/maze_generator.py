@@ -1,13 +1,19 @@
-import random
-from typing import List
+from typing import Iterator, List, Tuple
 
 from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.random_bits import RandomBits
+from interface.model.metrics import Metrics
 
 
 class MazeGenerator:
 
-    def __init__(self):
+    def __init__(self, seed=None):
         self.counter = 0
+        self.random = RandomBits(seed)
+
+    def seed(self, seed=None):
+        self.random = RandomBits(seed)
 
     def create_first_row(self, cols: int, current_row=0) -> List['Point']:
         result = [Point(0, 0, i, current_row, i) for i in range(cols)]
@@ -22,11 +28,12 @@ class MazeGenerator:
                 point.tag = element
 
     def process_right_wall(self, row: List['Point']) -> List['Point']:
+        coins = self.random.coins(len(row) - 1)
         for i in range(len(row) - 1):
             if row[i].tag == row[i + 1].tag:
                 row[i].right = 1
             else:
-                if random.choice([True, False]):
+                if coins[i]:
                     row[i].right = 1
                 else:
                     self.merge_sets(row, i, row[i].tag)
@@ -34,8 +41,9 @@ class MazeGenerator:
         return row
 
     def process_bottom_wall(self, row: List['Point']) -> List['Point']:
+        coins = self.random.coins(len(row))
         for i in range(len(row)):
-            if (random.choice([True, False])
+            if (coins[i]
                     and self.count_of_elements_in_unique_tag_without_bottom_wall(row, row[i].tag) > 1):
                 row[i].bottom = 1
             else:
@@ -70,15 +78,21 @@ class MazeGenerator:
                 self.merge_sets(maze[maze_rows - 1], i, maze[maze_rows - 1][i].tag)
         maze[maze_rows - 1][maze_cols - 1].bottom = 1
 
-    def generate_maze(self, rows: int, cols: int) -> List[List['Point']]:
+    def iter_rows(self, rows: int, cols: int) -> Iterator[Tuple[List[int], List[int]]]:
+        # Only the current row is kept, each (right, bottom) pair is final once yielded
+        if rows <= 0 or cols <= 0:
+            return
         self.counter = 0
-        maze = []
-        first_row = self.process_bottom_wall(self.process_right_wall(self.create_first_row(cols)))
-        maze.append(first_row)
-        for i in range(1, rows - 1):
-            new_row = self.process_bottom_wall(self.process_right_wall(self.create_new_row(maze[-1], i)))
-            maze.append(new_row)
-
-        maze.append(self.create_new_row(maze[-1], rows - 1))
-        self.build_last_row(maze, rows, cols)
-        return maze
+        row = self.create_first_row(cols)
+        for i in range(1, rows):
+            row = self.process_bottom_wall(self.process_right_wall(row))
+            yield [point.right for point in row], [point.bottom for point in row]
+            row = self.create_new_row(row, i)
+        self.build_last_row([row], 1, cols)
+        yield [point.right for point in row], [point.bottom for point in row]
+
+    def generate_maze(self, rows: int, cols: int, metrics: Metrics | None = None) -> MazeGrid:
+        if metrics is None:
+            return MazeGrid.from_rows(self.iter_rows(rows, cols), rows, cols)
+        with metrics.phase("generate"):
+            return MazeGrid.from_rows(metrics.track_rows(self.iter_rows(rows, cols)), rows, cols)
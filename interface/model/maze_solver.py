@@ -1,93 +1,439 @@
-from collections import deque
-from typing import List, Any, Tuple
+import heapq
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Generator, List, Any, Tuple
+
+import numpy as np
 
 from interface.model.maze_generator import MazeGenerator
 from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.metrics import Metrics, phase
+
+# Target outside of any maze, used to let the wave flood the whole reachable area
+NOWHERE = Point(0, 0, None, -1, -1)
+
+# Called with the number of expanded cells after every wave step, raising from it aborts the search
+Progress = Callable[[int], Any]
+
+# Cells reached by one wave step, in the order the wave found them
+Wave = List[Tuple[int, int]]
+
+# iter_wave() yields after expanding at most this many cells, and fills its distance map in bands
+# of LOAD_CHUNK_CELLS cells, so no single step of the generator takes more than about a millisecond
+WAVE_CHUNK_CELLS = 1024
+LOAD_CHUNK_CELLS = 1 << 18
 
 
 class MazeSolver:
-    def __init__(self):
-        self.maze: List[List[Point]] = []
+    STRATEGIES = ("lee", "bidirectional", "astar")
+
+    def __init__(self, cache_size: int = 0):
+        self.maze: MazeGrid | List = []
         self.rows: int = 0
         self.cols: int = 0
-        self.length_map: List[List[int]] = []
+        # Flat row-major copies of the wall planes, indexing bytes is the cheapest per-cell lookup
+        self.right: bytes = b""
+        self.bottom: bytes = b""
+        # Distances of the last search as an int32 (rows, cols) array, -1 for cells not reached
+        self.length_map: np.ndarray | List = []
+        # Flat int32 view of length_map, indexing it is as cheap as indexing a list
+        self.lengths: memoryview | None = None
         self.old_wave = deque()
+        # Next wave while step_wave() is part way through the current one
+        self.new_wave: Wave | None = None
         self.wave_step: int = 0
+        self.expanded: int = 0
+        # Set for the duration of solve() when the caller asked for instrumentation
+        self.metrics: Metrics | None = None
+        # LRU of complete distance fields keyed by (maze fingerprint, source cell)
+        self.cache_size = cache_size
+        self.cache: OrderedDict = OrderedDict()
+        # Fingerprint of the loaded maze, computed on the first cache lookup after load()
+        self.maze_key: bytes | None = None
 
     def is_good(self) -> bool:
         return self.rows > 0 and self.cols > 0
 
-    def step_wave(self, to:Point) -> bool:
-        self.wave_step += 1
-        wave = deque()
-        for row, col in self.old_wave:
+    def use_field(self, field: np.ndarray):
+        self.length_map = np.ascontiguousarray(field, dtype=np.int32)
+        self.lengths = memoryview(self.length_map.reshape(-1))
+
+    def start_field(self, from_: Point):
+        self.use_field(np.full((self.rows, self.cols), -1, dtype=np.int32))
+        self.start_wave(from_)
+
+    def start_wave(self, from_: Point):
+        # length_map must be all -1 already
+        self.old_wave = deque([(from_.x, from_.y)])
+        self.new_wave = None
+        self.wave_step = 0
+        self.lengths[from_.x * self.cols + from_.y] = 0
+
+    def step_wave(self, to: Point, limit: int | None = None) -> bool:
+        """Expands the current wave into the next one, True as soon as `to` is reached.
+
+        With `limit` at most that many cells are expanded, the next call goes on
+        where this one stopped. old_wave becomes the next wave once all of its
+        cells are expanded.
+        """
+        if self.new_wave is None:
+            self.wave_step += 1
+            self.new_wave = []
+        step = self.wave_step
+        wave = self.new_wave
+        old_wave = self.old_wave
+        rows = self.rows
+        cols = self.cols
+        right = self.right
+        bottom = self.bottom
+        lengths = self.lengths
+        count = len(old_wave) if limit is None else min(limit, len(old_wave))
+        for expanded in range(1, count + 1):
+            row, col = old_wave.popleft()
+            cell = row * cols + col
             # Down
-            if row + 1 < self.rows and self.maze[row][col].bottom == 0:
-                if self.length_map[row + 1][col] == -1:
+            if row + 1 < rows and bottom[cell] == 0:
+                if lengths[cell + cols] == -1:
                     wave.append((row + 1, col))
-                    self.length_map[row + 1][col] = self.wave_step
+                    lengths[cell + cols] = step
                 if row + 1 == to.x and col == to.y:
+                    self.expanded += expanded
                     return True
             # Up
-            if row > 0 and self.maze[row - 1][col].bottom == 0:
-                if self.length_map[row - 1][col] == -1:
+            if row > 0 and bottom[cell - cols] == 0:
+                if lengths[cell - cols] == -1:
                     wave.append((row - 1, col))
-                    self.length_map[row - 1][col] = self.wave_step
+                    lengths[cell - cols] = step
                 if row - 1 == to.x and col == to.y:
+                    self.expanded += expanded
                     return True
             # Right
-            if col + 1 < self.cols and self.maze[row][col].right == 0:
-                if self.length_map[row][col + 1] == -1:
+            if col + 1 < cols and right[cell] == 0:
+                if lengths[cell + 1] == -1:
                     wave.append((row, col + 1))
-                    self.length_map[row][col + 1] = self.wave_step
+                    lengths[cell + 1] = step
                 if row == to.x and col + 1 == to.y:
+                    self.expanded += expanded
                     return True
             # Left
-            if col > 0 and self.maze[row][col - 1].right == 0:
-                if self.length_map[row][col - 1] == -1:
+            if col > 0 and right[cell - 1] == 0:
+                if lengths[cell - 1] == -1:
                     wave.append((row, col - 1))
-                    self.length_map[row][col - 1] = self.wave_step
+                    lengths[cell - 1] = step
                 if row == to.x and col - 1 == to.y:
+                    self.expanded += expanded
                     return True
-        self.old_wave = wave
+        self.expanded += count
+        if not old_wave:
+            self.old_wave = deque(wave)
+            self.new_wave = None
         return False
 
     def make_path(self, from_: Point, to: Point) -> List[Tuple[int, int]]:
         path = [(to.x, to.y)]
         row, col = to.x, to.y
-        while self.length_map[row][col] != 0:
-            if (col > 0 and self.length_map[row][col - 1] + 1 == self.length_map[row][col] and
-                    self.maze[row][col - 1].right == 0):
+        cols = self.cols
+        lengths = self.lengths
+        cell = row * cols + col
+        while lengths[cell] != 0:
+            previous = lengths[cell] - 1
+            if col > 0 and lengths[cell - 1] == previous and self.right[cell - 1] == 0:
                 col -= 1
-            elif col + 1 < self.cols and self.length_map[row][col + 1] + 1 == self.length_map[row][col] and \
-                    self.maze[row][col].right == 0:
+                cell -= 1
+            elif col + 1 < cols and lengths[cell + 1] == previous and self.right[cell] == 0:
                 col += 1
-            elif row > 0 and self.length_map[row - 1][col] + 1 == self.length_map[row][col] and \
-                    self.maze[row - 1][col].bottom == 0:
+                cell += 1
+            elif row > 0 and lengths[cell - cols] == previous and self.bottom[cell - cols] == 0:
                 row -= 1
-            elif row + 1 < self.rows and self.length_map[row + 1][col] + 1 == self.length_map[row][col] and \
-                    self.maze[row][col].bottom == 0:
+                cell -= cols
+            elif row + 1 < self.rows and lengths[cell + cols] == previous and self.bottom[cell] == 0:
                 row += 1
+                cell += cols
             else:
                 return []
             path.append((row, col))
         path[-1] = (from_.x, from_.y)
         return path
 
-    def solve(self, from_: Point, to: Point,  maze: List[List[Point]]) -> List[Tuple[int, int]] | None:
+    def load(self, maze: MazeGrid | List[List[Point]]):
+        # Every load reads the current walls, solve_loaded() then reuses them and the fingerprint
+        self.read_planes(MazeGrid.coerce(maze))
+        self.maze_key = None
+
+    def read_planes(self, maze: MazeGrid):
         self.maze = maze
-        self.rows = len(maze)
-        self.cols = len(maze[0])
-        self.length_map = [[-1] * self.cols for _ in range(self.rows)]
+        self.rows, self.cols = maze.shape
+        self.right = maze.right.tobytes()
+        self.bottom = maze.bottom.tobytes()
+
+    def neighbours(self, cell: int) -> List[int]:
+        cols = self.cols
+        row, col = divmod(cell, cols)
+        result = []
+        if row + 1 < self.rows and self.bottom[cell] == 0:
+            result.append(cell + cols)
+        if row > 0 and self.bottom[cell - cols] == 0:
+            result.append(cell - cols)
+        if col + 1 < cols and self.right[cell] == 0:
+            result.append(cell + 1)
+        if col > 0 and self.right[cell - 1] == 0:
+            result.append(cell - 1)
+        return result
+
+    def trace_path(self, cell: int | None, parents: Dict[int, int | None]) -> List[Tuple[int, int]]:
+        path = []
+        while cell is not None:
+            path.append(divmod(cell, self.cols))
+            cell = parents[cell]
+        return path
+
+    def expand_layer(self, wave: List[int], visited: Dict[int, int | None],
+                     other: Dict[int, int | None]) -> Tuple[List[int], int | None]:
+        new_wave = []
+        for cell in wave:
+            self.expanded += 1
+            for neighbour in self.neighbours(cell):
+                if neighbour in visited:
+                    continue
+                visited[neighbour] = cell
+                if neighbour in other:
+                    return new_wave, neighbour
+                new_wave.append(neighbour)
+        return new_wave, None
+
+    def solve_bidirectional(self, from_: Point, to: Point) -> List[Tuple[int, int]]:
+        # Layers are expanded one side at a time, the smaller frontier first. Every shorter
+        # connection would have met in an earlier layer, so the first meeting is on a shortest path.
+        start = from_.x * self.cols + from_.y
+        goal = to.x * self.cols + to.y
+        if start == goal:
+            return [(to.x, to.y)]
+        forward = {start: None}
+        backward = {goal: None}
+        forward_wave = [start]
+        backward_wave = [goal]
+        while forward_wave and backward_wave:
+            self.wave_step += 1
+            if len(forward_wave) <= len(backward_wave):
+                forward_wave, meet = self.expand_layer(forward_wave, forward, backward)
+            else:
+                backward_wave, meet = self.expand_layer(backward_wave, backward, forward)
+            if self.metrics is not None:
+                self.metrics.peak("frontier", len(forward_wave) + len(backward_wave))
+            if meet is not None:
+                return self.trace_path(meet, backward)[::-1] + self.trace_path(forward[meet], forward)
+        return []
+
+    def solve_astar(self, from_: Point, to: Point) -> List[Tuple[int, int]]:
+        cols = self.cols
+        start = from_.x * cols + from_.y
+        goal = to.x * cols + to.y
+
+        def heuristic(cell: int) -> int:
+            row, col = divmod(cell, cols)
+            return abs(row - to.x) + abs(col - to.y)
+
+        distance = {start: 0}
+        parents = {start: None}
+        closed = set()
+        # Ties on f are broken towards the larger g, i.e. the cell closer to the goal
+        heap = [(heuristic(start), 0, start)]
+        metrics = self.metrics
+        while heap:
+            if metrics is not None:
+                metrics.peak("frontier", len(heap))
+            _, negative_g, cell = heapq.heappop(heap)
+            if cell in closed:
+                continue
+            if cell == goal:
+                return self.trace_path(goal, parents)
+            closed.add(cell)
+            self.expanded += 1
+            g = 1 - negative_g
+            for neighbour in self.neighbours(cell):
+                if g < distance.get(neighbour, g + 1):
+                    distance[neighbour] = g
+                    parents[neighbour] = cell
+                    heapq.heappush(heap, (g + heuristic(neighbour), -g, neighbour))
+        return []
+
+    def solve(self, from_: Point, to: Point, maze: MazeGrid | List[List[Point]],
+              strategy: str = "lee", progress: Progress | None = None,
+              metrics: Metrics | None = None) -> List[Tuple[int, int]] | None:
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        self.metrics = metrics
+        try:
+            with phase(metrics, "load"):
+                self.load(maze)
+            path = self.solve_loaded(from_, to, strategy, progress)
+        finally:
+            self.metrics = None
+        if metrics is not None:
+            metrics.count("solves")
+            metrics.count("wave_steps", self.wave_step)
+            metrics.count("expanded", self.expanded)
+            metrics.count("path_length", len(path) - 1 if path else 0)
+        return path
+
+    def solve_loaded(self, from_: Point, to: Point, strategy: str = "lee",
+                     progress: Progress | None = None) -> List[Tuple[int, int]] | None:
+        # Same as solve() on the maze of the last load(), for many queries on one maze
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
         self.old_wave = deque()
         self.wave_step = 0
+        self.expanded = 0
+        return self.search(from_, to, strategy, progress)
+
+    def search(self, from_: Point, to: Point, strategy: str,
+               progress: Progress | None) -> List[Tuple[int, int]] | None:
+        metrics = self.metrics
+        if strategy != "lee":
+            self.length_map = []
+            if not self.is_good():
+                return None
+            with phase(metrics, "search"):
+                if strategy == "bidirectional":
+                    return self.solve_bidirectional(from_, to)
+                return self.solve_astar(from_, to)
+
+        if self.cache_size > 0 and self.is_good():
+            with phase(metrics, "search"):
+                self.use_field(self.distance_field(from_, progress))
+            with phase(metrics, "path"):
+                return self.make_path(from_, to)
+
         if not self.is_good():
+            self.length_map = []
             return None
-        self.old_wave.append((from_.x, from_.y))
-        self.length_map[from_.x][from_.y] = 0
+        self.start_field(from_)
+
+        with phase(metrics, "search"):
+            while self.old_wave:
+                if self.step_wave(to):
+                    break
+                if metrics is not None:
+                    metrics.peak("frontier", len(self.old_wave))
+                if progress is not None:
+                    progress(self.expanded)
+
+        with phase(metrics, "path"):
+            return self.make_path(from_, to)
+
+    def iter_wave(self, from_: Point, to: Point,
+                  maze: MazeGrid | List[List[Point]]) -> Generator[Wave, None, List[Tuple[int, int]] | None]:
+        """Lee search of solve() in small slices of work.
 
+        Yields the cells reached, in the order the wave found them, after at most
+        WAVE_CHUNK_CELLS expanded cells, so a large wave spans several yields.
+        Filling the distance map yields [] every LOAD_CHUNK_CELLS cells. The path is the return value of the generator.
+        Nothing is computed before the first next().
+        """
+        maze = MazeGrid.coerce(maze)
+        rows, cols = maze.shape
+        self.maze = maze
+        self.rows, self.cols = rows, cols
+        self.maze_key = None
+        # Views instead of copies, the planes are only read and copying them at once would stall
+        self.right = memoryview(maze.right.reshape(-1))
+        self.bottom = memoryview(maze.bottom.reshape(-1))
+        field = np.empty((rows, cols), dtype=np.int32)
+        band = max(1, LOAD_CHUNK_CELLS // max(1, cols))
+        for start in range(0, rows, band):
+            field[start:start + band] = -1
+            yield []
+        self.use_field(field)
+        self.expanded = 0
+        if not self.is_good():
+            return None
+        self.start_wave(from_)
+        yield [(from_.x, from_.y)]
         while self.old_wave:
-            if self.step_wave(to):
+            reached = len(self.new_wave) if self.new_wave is not None else 0
+            if self.step_wave(to, WAVE_CHUNK_CELLS):
+                # The step stopped at the target, the rest of its wave is not needed. The target
+                # is already the last cell reached unless it was reached before, as the start.
+                front = self.new_wave[reached:]
+                if front[-1:] != [(to.x, to.y)]:
+                    front.append((to.x, to.y))
+                yield front
                 break
+            if self.new_wave is not None:
+                yield self.new_wave[reached:]
+            else:
+                # The wave is complete and became old_wave
+                yield list(itertools.islice(self.old_wave, reached, None))
+        return self.make_path(from_, to)
+
+    def distance_field(self, from_: Point, progress: Progress | None = None) -> np.ndarray:
+        if self.maze_key is None:
+            self.maze_key = self.maze.fingerprint()
+        key = (self.maze_key, (from_.x, from_.y))
+        field = self.cache.get(key)
+        if field is not None:
+            self.cache.move_to_end(key)
+            return field
 
+        field = self.flood(from_, progress)
+        self.cache[key] = field
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return field
+
+    def flood(self, from_: Point, progress: Progress | None = None) -> np.ndarray:
+        # Distances from `from_` to every cell of the loaded maze, -1 where unreachable
+        self.start_field(from_)
+        while self.old_wave:
+            self.step_wave(NOWHERE)
+            if self.metrics is not None:
+                self.metrics.peak("frontier", len(self.old_wave))
+            if progress is not None:
+                progress(self.expanded)
+        return self.length_map
+
+    def path_in_field(self, field: np.ndarray, from_: Point, to: Point) -> List[Tuple[int, int]]:
+        # Same path as solve() for a distance field of the loaded maze from `from_`, [] if `to` is unreachable
+        self.use_field(field)
+        if field[to.x, to.y] == -1:
+            return []
         return self.make_path(from_, to)
+
+    def clear_cache(self):
+        self.cache.clear()
+
+
+class WaveRun:
+    """Wave iterator advanced by the caller in slices of bounded time.
+
+    A GUI timer calls advance() once per frame, so the search never holds the
+    event loop for much longer than the budget of one slice.
+    """
+
+    def __init__(self, waves: Generator[Wave, None, List[Tuple[int, int]] | None]):
+        self.waves = waves
+        self.done = False
+        self.path: List[Tuple[int, int]] | None = None
+        self.steps = 0
+
+    def advance(self, seconds: float) -> List[Wave]:
+        # At least one wave per call, so even a tiny budget makes progress
+        deadline = time.perf_counter() + seconds
+        waves = []
+        while not self.done:
+            try:
+                waves.append(next(self.waves))
+            except StopIteration as stop:
+                self.done = True
+                self.path = stop.value
+                break
+            self.steps += 1
+            if time.perf_counter() >= deadline:
+                break
+        return waves
+
+    def finish(self) -> List[Tuple[int, int]] | None:
+        self.advance(float("inf"))
+        return self.path
@@ -0,0 +1,106 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from interface.model.vector_maze_solver import VectorMazeSolver
+from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+
+
+class MazeTreeIndex:
+    """Lowest-common-ancestor index over the cells of a perfect maze.
+
+    The passages of a perfect maze form a tree. It is rooted once and a binary
+    lifting table is built, after which the distance between any two cells takes
+    O(log n) and the path between them O(log n + path length).
+    """
+
+    def __init__(self, maze: MazeGrid | List[List[Point]], root: Tuple[int, int] = (0, 0)):
+        self.maze = MazeGrid.coerce(maze)
+        self.rows, self.cols = self.maze.shape
+        size = self.rows * self.cols
+        if size == 0:
+            raise ValueError("Cannot index an empty maze")
+
+        edges = (int(np.count_nonzero(self.maze.right[:, :-1] == 0))
+                 + int(np.count_nonzero(self.maze.bottom[:-1, :] == 0)))
+        if edges != size - 1:
+            raise ValueError(f"Maze is not perfect: {edges} passages for {size} cells")
+
+        self.root = root[0] * self.cols + root[1]
+        self.parent, self.depth = self.build_tree()
+        if np.any(self.depth < 0):
+            raise ValueError("Maze is not perfect: some cells are unreachable")
+
+        levels = max(1, int(self.depth.max()).bit_length())
+        self.up = np.empty((levels, size), dtype=np.int32)
+        self.up[0] = self.parent
+        for k in range(1, levels):
+            self.up[k] = self.up[k - 1][self.up[k - 1]]
+
+    def build_tree(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Breadth-first search from the root, one vectorized step per tree level
+        solver = VectorMazeSolver()
+        solver.load(self.maze)
+        size = self.rows * self.cols
+        parent = np.arange(size, dtype=np.int32)
+        depth = np.full(size, -1, dtype=np.int32)
+        depth[self.root] = 0
+        frontier = np.array([self.root], dtype=np.intp)
+        level = 0
+        while frontier.size:
+            level += 1
+            wave = []
+            for mask, offset in ((solver.open_down, self.cols), (solver.open_up, -self.cols),
+                                 (solver.open_right, 1), (solver.open_left, -1)):
+                sources = frontier[mask[frontier]]
+                targets = sources + offset
+                fresh = depth[targets] == -1
+                targets = targets[fresh]
+                depth[targets] = level
+                parent[targets] = sources[fresh]
+                wave.append(targets)
+            frontier = np.concatenate(wave)
+        return parent, depth
+
+    def cell(self, point: Point) -> int:
+        return point.x * self.cols + point.y
+
+    def lca(self, a: int, b: int) -> int:
+        depth = self.depth
+        up = self.up
+        if depth[a] < depth[b]:
+            a, b = b, a
+        diff = int(depth[a] - depth[b])
+        k = 0
+        while diff:
+            if diff & 1:
+                a = int(up[k, a])
+            diff >>= 1
+            k += 1
+        if a == b:
+            return a
+        for k in range(len(up) - 1, -1, -1):
+            if up[k, a] != up[k, b]:
+                a = int(up[k, a])
+                b = int(up[k, b])
+        return int(up[0, a])
+
+    def distance(self, from_: Point, to: Point) -> int:
+        a = self.cell(from_)
+        b = self.cell(to)
+        return int(self.depth[a] + self.depth[b] - 2 * self.depth[self.lca(a, b)])
+
+    def climb(self, cell: int, ancestor: int) -> List[Tuple[int, int]]:
+        chain = []
+        while cell != ancestor:
+            chain.append(divmod(cell, self.cols))
+            cell = int(self.parent[cell])
+        return chain
+
+    def path(self, from_: Point, to: Point) -> List[Tuple[int, int]]:
+        # Same orientation as MazeSolver.solve: from `to` back to `from_`
+        a = self.cell(from_)
+        b = self.cell(to)
+        ancestor = self.lca(a, b)
+        return self.climb(b, ancestor) + [divmod(ancestor, self.cols)] + self.climb(a, ancestor)[::-1]
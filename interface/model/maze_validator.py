@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+
+
+@dataclass
+class MazeReport:
+    rows: int
+    cols: int
+    passages: int
+    components: int
+    # Independent cycles, passages - cells + components, 0 for a forest
+    cycles: int
+    # Component of every cell, numbered 0.. in row-major order of their first cell
+    labels: np.ndarray
+
+    @property
+    def perfect(self) -> bool:
+        # Every cell reachable from every other by exactly one path
+        return self.components == 1 and self.cycles == 0
+
+    def connected(self, a: Point, b: Point) -> bool:
+        return self.labels[a.x, a.y] == self.labels[b.x, b.y]
+
+    def summary(self) -> str:
+        kind = "perfect" if self.perfect else "not perfect"
+        return f"{self.rows}x{self.cols} maze is {kind}: {self.components} components, {self.cycles} cycles"
+
+
+def row_runs(maze: MazeGrid) -> np.ndarray:
+    # First cell of the run of open right walls every cell is in, these sets need no union-find
+    rows, cols = maze.shape
+    starts = np.ones((rows, cols), dtype=bool)
+    starts[:, 1:] = maze.right[:, :-1] != 0
+    first = np.where(starts.reshape(-1), np.arange(rows * cols, dtype=np.int32), 0)
+    return np.maximum.accumulate(first)
+
+
+def column_edges(maze: MazeGrid) -> Tuple[np.ndarray, np.ndarray]:
+    # Flat cell indices of both ends of every open inner bottom wall
+    rows, cols = maze.shape
+    upper = np.flatnonzero(maze.bottom[:-1, :].reshape(-1) == 0).astype(np.int32)
+    return upper, upper + cols
+
+
+def compress(parent: np.ndarray, nodes: np.ndarray | None = None):
+    # Path compression in place, every pass halves the remaining depth. With `nodes` only
+    # their chains are compressed, which is enough when every node on them is listed.
+    while True:
+        if nodes is None:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                return
+            parent[:] = grandparent
+        else:
+            grandparent = parent[parent[nodes]]
+            if np.array_equal(grandparent, parent[nodes]):
+                return
+            parent[nodes] = grandparent
+
+
+def union_find(parent: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Root of every element after joining a[i] and b[i] for all i.
+
+    A disjoint-set forest processed in bulk: every round hooks each root onto the
+    smallest root it shares an edge with, then compresses paths. Roots only ever
+    point to smaller indices, so no cycles form, and the root of a set ends up
+    being its smallest element. Edges found inside one set are dropped, so later
+    rounds only touch the ends of the remaining edges and the roots above them.
+    `parent` must already point every element to the smallest element of its set.
+    """
+    size = parent.size
+    while True:
+        root_a = parent[a]
+        root_b = parent[b]
+        split = root_a != root_b
+        if not split.any():
+            break
+        a, b, root_a, root_b = a[split], b[split], root_a[split], root_b[split]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        if 16 * a.size >= size:
+            # Sequential passes over everything beat scattered ones over a large share of it
+            compress(parent)
+        else:
+            # Edge ends point to old roots and old roots only to old roots, so these are all the chains
+            compress(parent, np.concatenate([a, b, root_a, root_b]))
+    compress(parent)
+    return parent
+
+
+def validate_maze(maze: MazeGrid | List[List[Point]]) -> MazeReport:
+    """Components and cycles of the passage graph, O(cells) work in a few array passes.
+
+    Runs along the rows are labelled directly, union-find only joins them
+    through the open bottom walls.
+    """
+    maze = MazeGrid.coerce(maze)
+    rows, cols = maze.shape
+    size = rows * cols
+    if size == 0:
+        return MazeReport(rows, cols, 0, 0, 0, np.zeros((rows, cols), dtype=np.int32))
+    a, b = column_edges(maze)
+    passages = int(np.count_nonzero(maze.right[:, :-1] == 0)) + int(a.size)
+    roots = union_find(row_runs(maze), a, b)
+    # Roots are the smallest cell of their set, so numbering them in index order is row-major
+    is_root = roots == np.arange(size, dtype=np.int32)
+    numbers = np.cumsum(is_root, dtype=np.int32) - 1
+    labels = numbers[roots].reshape(rows, cols)
+    components = int(numbers[-1]) + 1
+    return MazeReport(rows, cols, passages, components, passages - size + components, labels)
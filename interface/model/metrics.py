@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Called with the phase name and its duration in seconds whenever a phase ends
+PhaseHook = Callable[[str, float], None]
+
+NO_PHASE = nullcontext()
+
+
+class Metrics:
+    """Opt-in timings and counters collected by the generators and solvers.
+
+    Pass an instance as `metrics=` to record into it. Phase timings and counters
+    add up over runs until reset(), peaks keep the largest value seen.
+    """
+
+    def __init__(self, hook: PhaseHook | None = None):
+        self.hook = hook
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.peaks: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            if self.hook is not None:
+                self.hook(name, elapsed)
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def peak(self, name: str, value: int):
+        if value > self.peaks.get(name, 0):
+            self.peaks[name] = value
+
+    def get(self, name: str, default=0):
+        for values in (self.counters, self.peaks, self.timings):
+            if name in values:
+                return values[name]
+        return default
+
+    def track_rows(self, rows_iter: Iterator[Tuple[List[int], List[int]]]) -> Iterator[Tuple[List[int], List[int]]]:
+        # Time spent producing rows goes to the "iter_rows" phase, every opened right wall is one merge of sets
+        rows_iter = iter(rows_iter)
+        while True:
+            start = time.perf_counter()
+            try:
+                right, bottom = next(rows_iter)
+            except StopIteration:
+                break
+            finally:
+                self.timings["iter_rows"] = self.timings.get("iter_rows", 0.0) + time.perf_counter() - start
+            self.count("rows")
+            self.count("merges", len(right) - sum(right))
+            yield right, bottom
+
+    def reset(self):
+        self.timings.clear()
+        self.counters.clear()
+        self.peaks.clear()
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {"timings": dict(self.timings), "counters": dict(self.counters), "peaks": dict(self.peaks)}
+
+    def summary(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.timings.items()]
+        parts += [f"{name}={value}" for name, value in self.counters.items()]
+        parts += [f"{name}={value}" for name, value in self.peaks.items()]
+        return " ".join(parts)
+
+
+def phase(metrics: Metrics | None, name: str):
+    # Shared no-op context when instrumentation is off
+    return NO_PHASE if metrics is None else metrics.phase(name)
@@ -0,0 +1,200 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from interface.model.maze_generator import MazeGenerator
+from interface.model.linear_maze_generator import LinearMazeGenerator
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.metrics import Metrics
+
+BAND_ROWS = 1024
+
+
+class BandGenerator(LinearMazeGenerator):
+    """Eller rows without the closing row, for one band of a parallel maze.
+
+    Sets holding cells of the band's first row carry the label of such a cell,
+    and labels are merged in a second disjoint-set as their sets merge. Once the
+    band is done it tells which component every cell of its first and of its
+    last row belongs to. Every component reaches the last row, as in Eller's
+    algorithm, so those two rows are all a seam needs to know.
+    """
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        # Label of every root of the current row, -1 for sets that started below the first row
+        self.labels: List[int] = []
+        self.components: List[int] = []
+
+    def find_label(self, label: int) -> int:
+        components = self.components
+        while components[label] != label:
+            components[label] = components[components[label]]
+            label = components[label]
+        return label
+
+    def reset_row(self, cols: int):
+        super().reset_row(cols)
+        self.labels = list(range(cols))
+        self.components = list(range(cols))
+
+    def union(self, a: int, b: int):
+        label_a = self.labels[a]
+        label_b = self.labels[b]
+        super().union(a, b)
+        if label_a == -1:
+            label_a = label_b
+        elif label_b != -1:
+            label_a = self.find_label(label_a)
+            self.components[self.find_label(label_b)] = label_a
+        self.labels[self.find(a)] = label_a
+
+    def carry_row(self, bottom: List[int]):
+        carried = [-1 if bottom[j] else self.labels[self.find(j)] for j in range(len(bottom))]
+        super().carry_row(bottom)
+        for j, label in enumerate(carried):
+            if self.parent[j] == j:
+                self.labels[j] = label
+
+    def band(self, rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Labels are in [0, 2 * cols): first row labels, or cols + root for sets without first row cells
+        right_plane = np.empty((rows, cols), dtype=np.uint8)
+        bottom_plane = np.empty((rows, cols), dtype=np.uint8)
+        self.reset_row(cols)
+        for i in range(rows):
+            if i:
+                self.carry_row(bottom)
+            right = [0] * cols
+            bottom = [0] * cols
+            self.linear_right_wall(right)
+            self.linear_bottom_wall(bottom)
+            right_plane[i] = right
+            bottom_plane[i] = bottom
+        top_labels = [self.find_label(j) for j in range(cols)]
+        bottom_labels = []
+        for j in range(cols):
+            root = self.find(j)
+            label = self.labels[root]
+            bottom_labels.append(cols + root if label == -1 else self.find_label(label))
+        return (right_plane, bottom_plane, np.array(top_labels, dtype=np.int64),
+                np.array(bottom_labels, dtype=np.int64))
+
+
+def generate_band(rows: int, cols: int, seed: int):
+    # Runs in a worker process, planes travel back bit-packed
+    right, bottom, top_labels, bottom_labels = BandGenerator(seed).band(rows, cols)
+    return (np.packbits(right, axis=1, bitorder="little"), np.packbits(bottom, axis=1, bitorder="little"),
+            top_labels, bottom_labels)
+
+
+class ParallelMazeGenerator(MazeGenerator):
+    """Eller's algorithm over horizontal bands generated in worker processes.
+
+    Bands of `band_rows` rows are independent forests whose every component
+    reaches the band's last row. The seams between them are then opened like an
+    Eller bottom pass over a disjoint-set of band components: a wall is only
+    opened between different components, and every component above a seam gets
+    at least one opening. The last row joins what is left, so the result is a
+    spanning tree of the grid. Band height, not the number of cores, decides the
+    maze, so a seed gives the same maze on every machine.
+    """
+
+    def __init__(self, seed=None, band_rows: int = BAND_ROWS, workers: int | None = None):
+        super().__init__(seed)
+        self.band_rows = band_rows
+        self.workers = workers or os.cpu_count()
+        # Disjoint-set over the components of all bands, and the last seam each group is known to cross
+        self.component_parent: Dict[int, int] = {}
+        self.crossed_seam: Dict[int, int] = {}
+        self.seam = 0
+
+    def band_seed(self) -> int:
+        return sum(bit << i for i, bit in enumerate(self.random.coins(64)))
+
+    def find_component(self, label: int) -> int:
+        parent = self.component_parent
+        root = parent.setdefault(label, label)
+        while parent[root] != root:
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def join_components(self, a: int, b: int):
+        self.component_parent[b] = a
+        self.crossed_seam[a] = max(self.crossed_seam.get(a, -1), self.crossed_seam.get(b, -1))
+
+    def stitch_seam(self, bottom: np.ndarray, above: np.ndarray, below: np.ndarray):
+        # Opens walls in the bottom row of the upper band, `above` and `below` label the cells on both sides
+        above = above.tolist()
+        below = below.tolist()
+        self.seam += 1
+        for label in below:
+            self.crossed_seam[self.find_component(label)] = self.seam
+        coins = self.random.coins(len(above))
+        bottom[:] = 1
+        for j in range(len(above)):
+            if coins[j]:
+                a = self.find_component(above[j])
+                b = self.find_component(below[j])
+                if a != b:
+                    bottom[j] = 0
+                    self.join_components(b, a)
+        for j in range(len(above)):
+            a = self.find_component(above[j])
+            if self.crossed_seam.get(a, -1) != self.seam:
+                bottom[j] = 0
+                self.join_components(self.find_component(below[j]), a)
+
+    def close_last_row(self, right: np.ndarray, bottom: np.ndarray, labels: np.ndarray):
+        labels = labels.tolist()
+        for i in range(len(labels) - 1):
+            a = self.find_component(labels[i])
+            b = self.find_component(labels[i + 1])
+            if a != b:
+                right[i] = 0
+                self.join_components(a, b)
+        right[-1] = 1
+        bottom[:] = 1
+
+    def generate_bands(self, bands: List[Tuple[int, int]], cols: int) -> Iterator[Tuple[np.ndarray, ...]]:
+        # Results come back in band order while later bands are still being generated
+        seeds = [self.band_seed() for _ in bands]
+        heights = [stop - start for start, stop in bands]
+        if len(bands) == 1 or self.workers == 1:
+            yield from map(generate_band, heights, [cols] * len(bands), seeds)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(bands))) as executor:
+            yield from executor.map(generate_band, heights, [cols] * len(bands), seeds)
+
+    def generate_maze(self, rows: int, cols: int, metrics: Metrics | None = None) -> MazeGrid:
+        if rows <= 0 or cols <= 0:
+            return MazeGrid.empty(max(rows, 0), max(cols, 0))
+        maze = MazeGrid.empty(rows, cols)
+        bands = [(start, min(start + self.band_rows, rows)) for start in range(0, rows, self.band_rows)]
+        self.component_parent = {}
+        self.crossed_seam = {}
+        self.seam = 0
+
+        previous_labels = None
+        for band, ((start, stop), result) in enumerate(zip(bands, self.generate_bands(bands, cols))):
+            right_bits, bottom_bits, top_labels, bottom_labels = result
+            maze.right[start:stop] = np.unpackbits(right_bits, axis=1, count=cols, bitorder="little")
+            maze.bottom[start:stop] = np.unpackbits(bottom_bits, axis=1, count=cols, bitorder="little")
+            # Labels of different bands must not collide in the shared disjoint-set
+            top_labels = top_labels + band * 2 * cols
+            bottom_labels = bottom_labels + band * 2 * cols
+            if previous_labels is not None:
+                self.stitch_seam(maze.bottom[start - 1], previous_labels, top_labels)
+            previous_labels = bottom_labels
+
+        self.close_last_row(maze.right[rows - 1], maze.bottom[rows - 1], previous_labels)
+        if metrics is not None:
+            metrics.count("rows", rows)
+            metrics.count("bands", len(bands))
+        return maze
+
+    def iter_rows(self, rows: int, cols: int) -> Iterator[Tuple[List[int], List[int]]]:
+        # Seams are only known once every band is done, so rows come from the finished maze
+        return self.generate_maze(rows, cols).iter_rows()
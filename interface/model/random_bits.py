@@ -0,0 +1,37 @@
+import random
+from typing import List
+
+import numpy as np
+
+
+class RandomBits:
+    """Source of fair coin flips drawn a whole row at a time.
+
+    Accepts a seed, a random.Random or a numpy.random.Generator. Equal seeds give
+    equal bit streams on every platform.
+    """
+
+    def __init__(self, seed=None):
+        self.numpy_rng: np.random.Generator | None = None
+        self.python_rng: random.Random | None = None
+        if isinstance(seed, np.random.Generator):
+            self.numpy_rng = seed
+        elif isinstance(seed, random.Random):
+            self.python_rng = seed
+        else:
+            self.python_rng = random.Random(seed)
+
+    def generator(self) -> np.random.Generator:
+        # For drawing whole grids at once, a seeded source yields a generator seeded from its stream
+        if self.numpy_rng is not None:
+            return self.numpy_rng
+        return np.random.default_rng(self.python_rng.getrandbits(64))
+
+    def coins(self, n: int) -> List[int]:
+        if n <= 0:
+            return []
+        if self.numpy_rng is not None:
+            return self.numpy_rng.integers(0, 2, n, dtype=np.uint8).tolist()
+        bits = self.python_rng.getrandbits(n)
+        packed = np.frombuffer(bits.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, count=n, bitorder="little").tolist()
@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from interface.model.maze_generator import MazeGenerator
+from interface.model.base_classes.maze_grid import MazeGrid
+from interface.model.metrics import Metrics, phase
+
+
+class GridMazeGenerator(MazeGenerator, ABC):
+    """Base of the generators that build the whole maze at once instead of row by row.
+
+    Subclasses implement carve(), which gets both wall planes fully closed and
+    opens the passages of a spanning tree in them.
+    """
+
+    @abstractmethod
+    def carve(self, right: np.ndarray, bottom: np.ndarray, rng: np.random.Generator):
+        pass
+
+    def generate_maze(self, rows: int, cols: int, metrics: Metrics | None = None) -> MazeGrid:
+        if rows <= 0 or cols <= 0:
+            return MazeGrid.empty(max(rows, 0), max(cols, 0))
+        maze = MazeGrid(np.ones((rows, cols), dtype=np.uint8), np.ones((rows, cols), dtype=np.uint8))
+        with phase(metrics, "generate"):
+            self.carve(maze.right, maze.bottom, self.random.generator())
+        if metrics is not None:
+            metrics.count("rows", rows)
+        return maze
+
+    def iter_rows(self, rows: int, cols: int) -> Iterator[Tuple[List[int], List[int]]]:
+        return self.generate_maze(rows, cols).iter_rows()
+
+
+class BinaryTreeMazeGenerator(GridMazeGenerator):
+    """Every cell opens its right or its bottom wall at random, a few array operations in all.
+
+    Cells of the last row can only open right and cells of the last column only
+    down, so every cell has one passage towards the bottom right corner. The
+    last row and column are always straight corridors.
+    """
+
+    def carve(self, right: np.ndarray, bottom: np.ndarray, rng: np.random.Generator):
+        rows, cols = right.shape
+        go_right = rng.integers(0, 2, (rows, cols), dtype=np.uint8).astype(bool)
+        go_right[-1, :] = True
+        go_right[:, -1] = False
+        right[go_right] = 0
+        bottom[~go_right] = 0
+        right[-1, -1] = 1
+        bottom[-1, -1] = 1
+
+
+class SidewinderMazeGenerator(GridMazeGenerator):
+    """Sidewinder: rows split into random runs, each run opens one bottom wall.
+
+    The last row is one corridor, so every run reaches it through its opening.
+    Runs of all rows are cut at once: a run id is a cumulative sum over the run
+    ends, and one random cell per run is picked from its start and length.
+    """
+
+    def carve(self, right: np.ndarray, bottom: np.ndarray, rng: np.random.Generator):
+        rows, cols = right.shape
+        closed = rng.integers(0, 2, (rows - 1, cols), dtype=np.uint8)
+        closed[:, -1] = 1
+        right[:-1] = closed
+        right[-1, :-1] = 0
+        # Flat index of every run end, the last column always ends a run so no run spans two rows
+        ends = np.flatnonzero(closed.reshape(-1))
+        starts = np.concatenate(([0], ends + 1))[:-1]
+        picks = starts + (rng.random(ends.size) * (ends - starts + 1)).astype(np.int64)
+        bottom[:-1].reshape(-1)[picks] = 0
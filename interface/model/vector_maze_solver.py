@@ -0,0 +1,98 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from interface.model.maze_solver import MazeSolver, Progress
+from interface.model.metrics import phase
+from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
+
+
+class VectorMazeSolver(MazeSolver):
+    """Lee wave expanded a whole frontier per step with NumPy.
+
+    The distance map is an int32 array and the frontier is an array of flat cell
+    indices, neighbours are gathered through precomputed open-passage masks.
+    Distances match MazeSolver, so make_path returns the same path.
+    """
+
+    STRATEGIES = ("lee",)
+
+    def __init__(self):
+        super().__init__()
+        self.open_down = np.zeros(0, dtype=bool)
+        self.open_up = np.zeros(0, dtype=bool)
+        self.open_right = np.zeros(0, dtype=bool)
+        self.open_left = np.zeros(0, dtype=bool)
+
+    def read_planes(self, maze: MazeGrid):
+        self.maze = maze
+        self.rows, self.cols = maze.shape
+        # make_path reads walls by flat index, numpy views work as well as bytes there
+        self.right = self.maze.right.reshape(-1)
+        self.bottom = self.maze.bottom.reshape(-1)
+
+        open_right = self.maze.right == 0
+        open_right[:, -1:] = False
+        open_down = self.maze.bottom == 0
+        open_down[-1:, :] = False
+        open_left = np.zeros_like(open_right)
+        open_left[:, 1:] = open_right[:, :-1]
+        open_up = np.zeros_like(open_down)
+        open_up[1:, :] = open_down[:-1, :]
+
+        self.open_right = open_right.reshape(-1)
+        self.open_down = open_down.reshape(-1)
+        self.open_left = open_left.reshape(-1)
+        self.open_up = open_up.reshape(-1)
+
+    def step_frontier(self, frontier: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        self.wave_step += 1
+        self.expanded += frontier.size
+        cols = self.cols
+        wave = []
+        # Labelling each direction before filtering the next one keeps the new frontier free of duplicates
+        for mask, offset in ((self.open_down, cols), (self.open_up, -cols),
+                             (self.open_right, 1), (self.open_left, -1)):
+            candidates = frontier[mask[frontier]] + offset
+            candidates = candidates[distances[candidates] == -1]
+            distances[candidates] = self.wave_step
+            wave.append(candidates)
+        return np.concatenate(wave)
+
+    def flood(self, from_: Point, progress: Progress | None = None) -> np.ndarray:
+        self.wave_step = 0
+        field = np.full((self.rows, self.cols), -1, dtype=np.int32)
+        distances = field.reshape(-1)
+        frontier = np.array([from_.x * self.cols + from_.y], dtype=np.intp)
+        distances[frontier] = 0
+        while frontier.size:
+            frontier = self.step_frontier(frontier, distances)
+            if self.metrics is not None:
+                self.metrics.peak("frontier", frontier.size)
+            if progress is not None:
+                progress(self.expanded)
+        return field
+
+    def search(self, from_: Point, to: Point, strategy: str,
+               progress: Progress | None) -> List[Tuple[int, int]] | None:
+        metrics = self.metrics
+        if not self.is_good():
+            return None
+        self.use_field(np.full((self.rows, self.cols), -1, dtype=np.int32))
+        distances = self.length_map.reshape(-1)
+        target = to.x * self.cols + to.y
+        frontier = np.array([from_.x * self.cols + from_.y], dtype=np.intp)
+        distances[frontier] = 0
+
+        with phase(metrics, "search"):
+            while frontier.size and distances[target] == -1:
+                frontier = self.step_frontier(frontier, distances)
+                if metrics is not None:
+                    metrics.peak("frontier", frontier.size)
+                if progress is not None:
+                    progress(self.expanded)
+        self.old_wave = frontier
+
+        with phase(metrics, "path"):
+            return self.make_path(from_, to)
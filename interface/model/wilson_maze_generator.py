@@ -0,0 +1,58 @@
+import numpy as np
+
+from interface.model.vector_maze_generator import GridMazeGenerator
+
+# Random directions are drawn this many at a time
+DIRECTION_BATCH = 1 << 16
+
+
+class WilsonMazeGenerator(GridMazeGenerator):
+    """Wilson's algorithm, every spanning tree of the grid is equally likely.
+
+    Loop-erased random walks from every cell not yet in the tree until they hit
+    it. A walk only remembers the last way it left each cell, which erases its
+    loops, then the walk is retraced from its start into the tree. Walks are
+    inherently sequential, so this is far slower than the other generators and
+    meant for when unbiased mazes matter.
+    """
+
+    def carve(self, right: np.ndarray, bottom: np.ndarray, rng: np.random.Generator):
+        rows, cols = right.shape
+        size = rows * cols
+        right_flat = right.reshape(-1)
+        bottom_flat = bottom.reshape(-1)
+        steps = (1, cols, -1, -cols)
+        in_tree = bytearray(size)
+        in_tree[int(rng.integers(size))] = 1
+        exits = [0] * size
+        directions = []
+        drawn = 0
+        for start in range(size):
+            cell = start
+            while not in_tree[cell]:
+                if drawn == len(directions):
+                    directions = rng.integers(0, 4, DIRECTION_BATCH, dtype=np.uint8).tolist()
+                    drawn = 0
+                direction = directions[drawn]
+                drawn += 1
+                row, col = divmod(cell, cols)
+                # Moves off the grid are redrawn, which keeps the step uniform over the neighbours
+                if (direction == 0 and col + 1 == cols or direction == 1 and row + 1 == rows
+                        or direction == 2 and col == 0 or direction == 3 and row == 0):
+                    continue
+                exits[cell] = direction
+                cell += steps[direction]
+            cell = start
+            while not in_tree[cell]:
+                in_tree[cell] = 1
+                direction = exits[cell]
+                following = cell + steps[direction]
+                if direction == 0:
+                    right_flat[cell] = 0
+                elif direction == 1:
+                    bottom_flat[cell] = 0
+                elif direction == 2:
+                    right_flat[following] = 0
+                else:
+                    bottom_flat[following] = 0
+                cell = following
@@ -1,7 +1,34 @@
+import json
+import os
+import pickle
+import random
+
+import numpy as np
 import pytest
 from interface.model.base_classes.point import Point
+from interface.model.base_classes.maze_grid import MazeGrid
 from interface.model.maze_generator import MazeGenerator
-from interface.model.maze_solver import MazeSolver
+from interface.model.maze_solver import MazeSolver, WaveRun
+from interface.model import maze_solver as maze_solver_module
+from interface.model.linear_maze_generator import LinearMazeGenerator
+from interface.model.parallel_maze_generator import ParallelMazeGenerator
+from interface.model.vector_maze_solver import VectorMazeSolver
+from interface.model.vector_maze_generator import GridMazeGenerator
+from interface.model.maze_tree_index import MazeTreeIndex
+from interface.model.incremental_maze_solver import IncrementalMazeSolver
+from interface.model.maze_validator import validate_maze
+from interface.maze_interface import MazeInterface
+from interface.maze_solver_interface import MazeSolverInterface
+from interface.model.metrics import Metrics
+from frontend.parser.maze_data import read_file, write_file, write_rows
+from frontend.parser.maze_binary import binary_to_text, open_binary, read_binary, text_to_binary, write_binary
+from frontend.parser import maze_image
+from frontend.parser.maze_corpus import MazeCorpus
+from frontend.geometry import (cell_index, clamp_offset, heat_levels, heat_palette, lod_level, lod_window,
+                               mark_cells, mark_pyramid, path_corners, visible_range, wall_density_pyramid,
+                               wall_segments, zoom_offset)
+import benchmark
+import cli
 from collections import deque
 
 
@@ -167,3 +194,828 @@ def test_solver_path_validity(maze_generator, maze_solver):
                 assert maze[x1][y1].bottom == 0
             else:  # Вверх
                 assert maze[x2][y2].bottom == 0
+
+
+def test_maze_grid_point_view(maze_generator):
+    maze = maze_generator.generate_maze(3, 4)
+    assert isinstance(maze, MazeGrid)
+    assert maze.right.dtype == maze.bottom.dtype
+    assert maze.right.shape == (3, 4)
+
+    cell = maze[1][2]
+    assert (cell.x, cell.y) == (1, 2)
+    assert cell.right == maze.right[1, 2]
+    cell.bottom = 1
+    assert maze.bottom[1, 2] == 1
+    assert maze[-1][-1].right == 1
+    with pytest.raises(IndexError):
+        maze[3]
+
+
+def test_maze_grid_from_points_round_trip(maze_generator, maze_solver):
+    maze = maze_generator.generate_maze(5, 5)
+    points = maze.to_points()
+    assert MazeGrid.from_points(points) == maze
+
+    from_point = Point(0, 0, 0, 0, 0)
+    to_point = Point(0, 0, 0, 4, 4)
+    assert maze_solver.solve(from_point, to_point, points) == maze_solver.solve(from_point, to_point, maze)
+
+
+@pytest.mark.parametrize("rows, cols", [(2, 2), (5, 7), (9, 3), (3, 40)])
+def test_linear_generator_matches_classic(rows, cols):
+    for seed in range(20):
+        classic = MazeGenerator(seed).generate_maze(rows, cols)
+        linear = LinearMazeGenerator(seed).generate_maze(rows, cols)
+        assert linear == classic
+
+
+@pytest.mark.parametrize("rows, cols", [(6, 6), (6, 10), (10, 6)])
+def test_linear_generator_paths_connected(maze_solver, rows, cols):
+    maze = MazeInterface().generate_maze(rows, cols, algorithm="linear")
+    from_point = Point(0, 0, 0, 0, 0)
+    for x in range(rows):
+        for y in range(cols):
+            path = maze_solver.solve(from_point, Point(0, 0, 0, x, y), maze)
+            assert path[0] == (x, y)
+            assert path[-1] == (0, 0)
+
+
+def test_maze_interface_unknown_mode():
+    with pytest.raises(ValueError):
+        MazeInterface().generate_maze(3, 3, algorithm="unknown")
+
+
+def test_iter_rows_streams_generate_maze():
+    for generator in (MazeGenerator(), LinearMazeGenerator()):
+        generator.seed(7)
+        rows = list(generator.iter_rows(6, 5))
+        generator.seed(7)
+        maze = generator.generate_maze(6, 5)
+        assert len(rows) == 6
+        assert [right for right, _ in rows] == maze.right.tolist()
+        assert [bottom for _, bottom in rows] == maze.bottom.tolist()
+
+
+def test_single_row_maze(maze_generator):
+    maze = maze_generator.generate_maze(1, 4)
+    assert maze.shape == (1, 4)
+    assert maze.right.tolist() == [[0, 0, 0, 1]]
+    assert maze.bottom.tolist() == [[1, 1, 1, 1]]
+
+
+def test_write_rows_matches_text_format(tmp_path, maze_generator):
+    maze = maze_generator.generate_maze(4, 3)
+    expected = "4 3\n"
+    expected += "".join(" ".join(str(i) for i in row) + "\n" for row in maze.right.tolist())
+    expected += "\n"
+    expected += "".join(" ".join(str(j) for j in row) + "\n" for row in maze.bottom.tolist())
+
+    filename = tmp_path / "maze.txt"
+    write_rows(filename, 4, 3, maze.iter_rows(), chunk_rows=3)
+    assert filename.read_text() == expected
+    assert read_file(filename) == maze
+
+    streamed = tmp_path / "streamed.txt"
+    write_rows(streamed, 50, 20, LinearMazeGenerator().iter_rows(50, 20), chunk_rows=8)
+    assert read_file(streamed).shape == (50, 20)
+
+
+@pytest.mark.parametrize("make_seed", [lambda: 42, lambda: random.Random(42), lambda: np.random.default_rng(42)])
+def test_seeded_generation_is_reproducible(make_seed):
+    first = MazeGenerator(make_seed()).generate_maze(8, 9)
+    second = MazeGenerator(make_seed()).generate_maze(8, 9)
+    assert first == second
+    assert LinearMazeGenerator(make_seed()).generate_maze(8, 9) == first
+
+
+def test_maze_interface_seed():
+    interface = MazeInterface()
+    first = interface.generate_maze(10, 10, algorithm="linear", seed=3)
+    assert interface.generate_maze(10, 10, algorithm="classic", seed=3) == first
+    assert interface.generate_maze(10, 10, algorithm="linear", seed=4) != first
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 6), (7, 1), (8, 9)])
+def test_vector_solver_matches_lee(maze_solver, rows, cols):
+    maze = LinearMazeGenerator(rows * cols).generate_maze(rows, cols)
+    maze.right[rows // 2, :-1] = 0  # Open a corridor so the maze has cycles
+    vector_solver = VectorMazeSolver()
+    for x1 in range(rows):
+        for y1 in range(cols):
+            from_point = Point(0, 0, 0, x1, y1)
+            to_point = Point(0, 0, 0, rows - 1 - x1, cols - 1 - y1)
+            expected = maze_solver.solve(from_point, to_point, maze)
+            assert vector_solver.solve(from_point, to_point, maze) == expected
+
+
+def test_vector_solver_no_path(maze_generator):
+    maze = maze_generator.generate_maze(3, 3)
+    maze[1][2].bottom = 1
+    maze[2][1].right = 1
+    path = MazeSolverInterface().solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 2, 2), maze, engine="numpy")
+    assert path == []
+
+
+@pytest.mark.parametrize("strategy", ["bidirectional", "astar"])
+def test_search_strategies_find_shortest_paths(maze_solver, strategy):
+    maze = LinearMazeGenerator(11).generate_maze(9, 12)
+    maze.right[4, :-1] = 0
+    maze.bottom[:-1, 6] = 0
+    for x1, y1, x2, y2 in [(0, 0, 8, 11), (8, 0, 0, 11), (4, 4, 4, 4), (2, 9, 7, 1)]:
+        from_point = Point(0, 0, 0, x1, y1)
+        to_point = Point(0, 0, 0, x2, y2)
+        expected = maze_solver.solve(from_point, to_point, maze)
+        lee_expanded = maze_solver.expanded
+        path = maze_solver.solve(from_point, to_point, maze, strategy=strategy)
+        assert len(path) == len(expected)
+        assert path[0] == (x2, y2)
+        assert path[-1] == (x1, y1)
+        assert maze_solver.expanded <= lee_expanded + 1
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            assert abs(r1 - r2) + abs(c1 - c2) == 1
+
+
+@pytest.mark.parametrize("strategy", ["bidirectional", "astar"])
+def test_search_strategies_no_path(maze_generator, maze_solver, strategy):
+    maze = maze_generator.generate_maze(3, 3)
+    maze[1][2].bottom = 1
+    maze[2][1].right = 1
+    assert maze_solver.solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 2, 2), maze, strategy=strategy) == []
+
+
+def test_unknown_strategy(maze_solver):
+    with pytest.raises(ValueError):
+        maze_solver.solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 0, 0), MazeGrid.empty(1, 1), strategy="dfs")
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 7), (6, 1), (7, 9)])
+def test_tree_index_matches_lee(maze_solver, rows, cols):
+    maze = LinearMazeGenerator(rows + cols).generate_maze(rows, cols)
+    index = MazeTreeIndex(maze)
+    for x1 in range(rows):
+        for y1 in range(cols):
+            from_point = Point(0, 0, 0, x1, y1)
+            to_point = Point(0, 0, 0, rows - 1 - x1, (y1 * 3) % cols)
+            expected = maze_solver.solve(from_point, to_point, maze)
+            assert index.path(from_point, to_point) == expected
+            assert index.distance(from_point, to_point) == len(expected) - 1
+
+
+def test_tree_index_rejects_imperfect_maze(maze_generator):
+    maze = maze_generator.generate_maze(4, 4)
+    # A 2x2 loop is a cycle whatever the generator opened
+    maze.right[:2, 0] = 0
+    maze.bottom[0, :2] = 0
+    with pytest.raises(ValueError):
+        MazeTreeIndex(maze)
+
+
+def test_solver_interface_tree_engine(maze_generator):
+    interface = MazeSolverInterface()
+    maze = maze_generator.generate_maze(6, 6)
+    from_point = Point(0, 0, 0, 0, 5)
+    to_point = Point(0, 0, 0, 5, 0)
+    assert interface.solve(from_point, to_point, maze, engine="tree") == interface.solve(from_point, to_point, maze)
+    index = interface.tree_index
+    interface.solve(from_point, to_point, maze, engine="tree")
+    assert interface.expanded == 0
+    interface.solve(to_point, from_point, maze, engine="tree")
+    assert interface.tree_index is index
+
+
+def test_distance_field_cache(maze_generator):
+    maze = maze_generator.generate_maze(6, 7)
+    maze.right[2, :-1] = 0
+    cached_solver = MazeSolver(cache_size=2)
+    plain_solver = MazeSolver()
+    from_point = Point(0, 0, 0, 1, 1)
+    for x in range(6):
+        for y in range(7):
+            to_point = Point(0, 0, 0, x, y)
+            assert cached_solver.solve(from_point, to_point, maze) == plain_solver.solve(from_point, to_point, maze)
+    assert len(cached_solver.cache) == 1
+    assert cached_solver.expanded == 0
+
+    for x in range(3):
+        cached_solver.solve(Point(0, 0, 0, x, 0), from_point, maze)
+    assert len(cached_solver.cache) == 2
+
+    # An equal copy has the same fingerprint and reuses the fields
+    to_point = Point(0, 0, 0, 5, 6)
+    cached_solver.solve(Point(0, 0, 0, 2, 0), to_point, maze.copy())
+    assert len(cached_solver.cache) == 2 and cached_solver.expanded == 0
+
+    # Editing the maze changes its fingerprint, so stale fields are never reused
+    maze.bottom[0, :] = 1
+    assert cached_solver.solve(from_point, to_point, maze) == plain_solver.solve(from_point, to_point, maze)
+
+    cached_solver.clear_cache()
+    assert len(cached_solver.cache) == 0
+
+
+def test_solve_reads_walls_edited_in_place(maze_generator):
+    maze = maze_generator.generate_maze(8, 8)
+    maze.right[:, :-1] = 0
+    maze.bottom[:-1, :] = 0
+    from_point = Point(0, 0, 0, 0, 0)
+    to_point = Point(0, 0, 0, 7, 7)
+    for solver in (MazeSolver(), MazeSolver(cache_size=2), VectorMazeSolver()):
+        maze.bottom[0, :] = 0
+        assert len(solver.solve(from_point, to_point, maze)) == 15
+        maze.bottom[0, :] = 1
+        assert solver.solve(from_point, to_point, maze) == []
+
+
+def test_loaded_queries_do_not_rehash_the_maze(maze_generator, monkeypatch):
+    maze = maze_generator.generate_maze(8, 8)
+    hashed = []
+    fingerprint = MazeGrid.fingerprint
+    monkeypatch.setattr(MazeGrid, "fingerprint", lambda grid: hashed.append(grid) or fingerprint(grid))
+    solver = MazeSolver(cache_size=2)
+    solver.load(maze)
+    for x in range(8):
+        solver.solve_loaded(Point(0, 0, 0, 0, 0), Point(0, 0, 0, x, 7))
+    assert len(hashed) == 1
+    solver.solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 7, 7), maze)
+    assert len(hashed) == 2
+
+
+@pytest.mark.parametrize("solver", [MazeSolver(), MazeSolver(cache_size=1), VectorMazeSolver()])
+def test_solver_progress_and_abort(maze_generator, solver):
+    maze = maze_generator.generate_maze(12, 12)
+    from_point = Point(0, 0, 0, 0, 0)
+    to_point = Point(0, 0, 0, 11, 11)
+    reported = []
+    path = solver.solve(from_point, to_point, maze, progress=reported.append)
+    assert path == MazeSolver().solve(from_point, to_point, maze)
+    assert reported and reported == sorted(reported)
+    assert reported[-1] <= 144
+
+    def abort(expanded):
+        raise RuntimeError("cancelled")
+
+    solver.clear_cache()
+    with pytest.raises(RuntimeError):
+        solver.solve(from_point, to_point, maze, progress=abort)
+    assert len(solver.cache) == 0
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (3, 8), (7, 13)])
+def test_binary_format_round_trip(tmp_path, rows, cols):
+    maze = LinearMazeGenerator(rows).generate_maze(rows, cols)
+    binary = tmp_path / "maze.maze"
+    write_binary(binary, maze)
+    assert binary.stat().st_size == 16 + 2 * rows * ((cols + 7) // 8)
+    assert read_binary(binary) == maze
+
+    mapped = open_binary(binary)
+    assert mapped.shape == (rows, cols)
+    assert mapped.read_rows(rows - 1, rows) == MazeGrid(maze.right[-1:], maze.bottom[-1:])
+
+    text = tmp_path / "maze.txt"
+    binary_to_text(binary, text)
+    assert read_file(text) == maze
+    converted = tmp_path / "converted.maze"
+    text_to_binary(text, converted)
+    assert converted.read_bytes() == binary.read_bytes()
+
+
+def test_binary_format_rejects_other_files(tmp_path):
+    text = tmp_path / "maze.txt"
+    write_rows(text, 2, 2, MazeGenerator(1).iter_rows(2, 2))
+    with pytest.raises(ValueError):
+        open_binary(text)
+
+
+def test_text_format_bulk_round_trip(tmp_path):
+    maze = LinearMazeGenerator(5).generate_maze(23, 17)
+    filename = tmp_path / "maze.txt"
+    write_file(filename, maze, chunk_rows=5)
+    streamed = tmp_path / "streamed.txt"
+    write_rows(streamed, 23, 17, maze.iter_rows())
+    assert filename.read_bytes() == streamed.read_bytes()
+    for chunk_size in (1, 7, 1 << 20):
+        assert read_file(filename, chunk_size=chunk_size) == maze
+
+
+@pytest.mark.parametrize("content", [
+    "2 2\n0 1\n1 1\n\n0 0\n",
+    "2 2\n0 1\n1 1 1\n\n0 0\n1 1\n",
+    "2 2\n0 1\n1\n\n0 0\n1 1 1\n",
+    "1 2\n10 1\n\n0 0\n",
+    "1 2\n2 1\n\n0 0\n",
+    "1\n0\n\n0\n",
+])
+def test_text_format_rejects_bad_dimensions(tmp_path, content):
+    filename = tmp_path / "maze.txt"
+    filename.write_text(content)
+    with pytest.raises(ValueError):
+        read_file(filename)
+
+
+def test_wall_segments_cover_walls_exactly():
+    maze = LinearMazeGenerator(9).generate_maze(11, 13)
+    horizontal, vertical = wall_segments(maze)
+    bottom = np.zeros_like(maze.bottom)
+    for row, start, stop in horizontal:
+        assert not bottom[row, start:stop].any()
+        bottom[row, start:stop] = 1
+    right = np.zeros_like(maze.right)
+    for col, start, stop in vertical:
+        assert not right[start:stop, col].any()
+        right[start:stop, col] = 1
+    assert MazeGrid(right, bottom) == maze
+    # Runs are maximal, so there are fewer segments than walls
+    assert len(horizontal) + len(vertical) < int(maze.right.sum() + maze.bottom.sum())
+
+
+def test_visible_range_edges():
+    # 10 pixel cells in a 100 pixel view
+    assert visible_range(0, 10, 100, 50) == (0, 10)
+    # A partly visible cell on either side counts, one that only touches the edge does not
+    assert visible_range(-5, 10, 100, 50) == (0, 11)
+    assert visible_range(-10, 10, 100, 50) == (1, 11)
+    assert visible_range(-10.5, 10, 100, 50) == (1, 12)
+    # Clipped to the maze, and empty once the maze is out of view
+    assert visible_range(0, 10, 100, 4) == (0, 4)
+    assert visible_range(-460, 10, 100, 50) == (46, 50)
+    assert visible_range(-600, 10, 100, 50) == (50, 50)
+    assert visible_range(30, 10, 100, 50) == (0, 7)
+
+
+def test_cell_hit_testing_after_zoom_and_pan():
+    assert cell_index(0, 0, 10, 5) == 0
+    assert cell_index(9.99, 0, 10, 5) == 0
+    assert cell_index(10, 0, 10, 5) == 1
+    assert cell_index(49.99, 0, 10, 5) == 4
+    assert cell_index(50, 0, 10, 5) is None
+    assert cell_index(-0.01, 0, 10, 5) is None
+    assert cell_index(3, -25, 10, 5) == 2
+
+    # Zooming keeps the cell under the cursor, at any cursor position and zoom step
+    for anchor in (0.0, 17.5, 63.2, 99.9):
+        for scale in (1.25, 2.0, 3.7):
+            offset = zoom_offset(anchor, -40.0, scale)
+            assert cell_index(anchor, offset, 10 * scale, 100) == cell_index(anchor, -40.0, 10, 100)
+    # Panning past the maze is clamped so it keeps covering the view
+    assert clamp_offset(15, 100, 500) == 0
+    assert clamp_offset(-450, 100, 500) == -400
+    assert clamp_offset(-120, 100, 500) == -120
+    assert cell_index(99.9, clamp_offset(-450, 100, 500), 10, 50) == 49
+
+
+def test_lod_level_and_window():
+    assert lod_level(4.0, 8) == 0
+    assert lod_level(1.0, 8) == 0
+    assert lod_level(0.5, 8) == 1
+    assert lod_level(0.3, 8) == 2
+    assert lod_level(0.001, 8) == 7
+    assert lod_level(0.25, 1) == 0
+    # Level k texels cover 2**k cells, partly covered texels are included
+    assert lod_window(0, 10, 0, 7, 0) == (0, 10, 0, 7)
+    assert lod_window(3, 8, 5, 9, 1) == (1, 4, 2, 5)
+    assert lod_window(4, 8, 0, 1, 2) == (1, 2, 0, 1)
+
+
+def test_wall_density_pyramid_levels():
+    maze = LinearMazeGenerator(3).generate_maze(5, 7)
+    levels = wall_density_pyramid(maze)
+    assert [level.shape for level in levels] == [(5, 7), (3, 4), (2, 2), (1, 1)]
+    assert np.array_equal(levels[0], (maze.right.astype(int) + maze.bottom) * 127)
+    assert levels[1][0, 0] == (levels[0][:2, :2].astype(int).sum()) // 4
+    # Odd edges repeat their last row and column
+    assert levels[1][2, 3] == levels[0][4, 6]
+    walls = np.ones((4, 4), dtype=np.uint8)
+    assert all(np.all(level == 254) for level in wall_density_pyramid(MazeGrid(walls, walls)))
+    assert [level.shape for level in wall_density_pyramid(MazeGrid.empty(1, 1))] == [(1, 1)]
+
+
+def test_cli_generate_and_solve(tmp_path, capsys):
+    out = tmp_path / "corpus"
+    assert cli.main(["generate", "--size", "6x9", "--size", "4x4", "--count", "2", "--seed", "5",
+                     "--format", "binary", "--out", str(out), "--workers", "2"]) == 0
+    files = capsys.readouterr().out.split()
+    assert [os.path.basename(f) for f in files] == ["maze_6x9_5.maze", "maze_6x9_6.maze",
+                                                   "maze_4x4_7.maze", "maze_4x4_8.maze"]
+    maze = read_binary(files[0])
+    assert maze == MazeInterface().generate_maze(6, 9, algorithm="linear", seed=5)
+
+    queries = tmp_path / "queries.txt"
+    queries.write_text("0 0 5 8\n# comment\n\n2 3 2 3\n")
+    answers = tmp_path / "answers.txt"
+    assert cli.main(["solve", files[0], str(queries), "--engine", "tree", "--out", str(answers),
+                     "--workers", "1"]) == 0
+    first, second = answers.read_text().splitlines()
+    path = MazeSolver().solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 5, 8), maze)
+    assert first == cli.format_path(path)
+    assert first.split()[1] == "0,0" and first.split()[-1] == "5,8"
+    assert second == "0 2,3"
+
+
+def test_benchmark_compare_flags_regressions(tmp_path):
+    results = [benchmark.Result("solve/a", 1.0, 10 ** 6, 100), benchmark.Result("solve/b", 1.0, 10 ** 6, 100)]
+    baseline_file = tmp_path / "baseline.json"
+    benchmark.save_baseline(baseline_file, results)
+    baseline = json.loads(baseline_file.read_text())["results"]
+    assert benchmark.compare(results, baseline, 0.1) == []
+
+    slower = [benchmark.Result("solve/a", 1.5, 10 ** 6, 100), benchmark.Result("solve/b", 1.0, 4 * 10 ** 6, 100),
+              benchmark.Result("solve/new", 9.0, 10 ** 9, 100)]
+    regressions = benchmark.compare(slower, baseline, 0.1)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("solve/a") and "peak" in regressions[1]
+
+
+def test_metrics_record_generation_and_search():
+    phases = []
+    metrics = Metrics(hook=lambda name, seconds: phases.append(name))
+    maze = LinearMazeGenerator(4).generate_maze(9, 11, metrics=metrics)
+    assert maze == LinearMazeGenerator(4).generate_maze(9, 11)
+    assert metrics.get("rows") == 9
+    # A perfect maze is a spanning tree: every merge of two sets adds one of its rows * cols - 1 edges
+    assert metrics.get("merges") + int(np.count_nonzero(maze.bottom[:-1] == 0)) == 9 * 11 - 1
+    assert phases == ["generate"]
+
+    metrics.reset()
+    from_point = Point(0, 0, 0, 0, 0)
+    to_point = Point(0, 0, 0, 8, 10)
+    for solver in (MazeSolver(), MazeSolver(cache_size=1), VectorMazeSolver()):
+        path = solver.solve(from_point, to_point, maze, metrics=metrics)
+        assert solver.metrics is None
+    assert metrics.get("solves") == 3
+    assert metrics.get("path_length") == 3 * (len(path) - 1)
+    assert metrics.get("frontier") > 0
+    assert metrics.get("expanded") > 0
+    assert set(metrics.timings) == {"load", "search", "path"}
+    assert "solves=3" in metrics.summary()
+
+
+def assert_perfect(maze: MazeGrid):
+    rows, cols = maze.shape
+    passages = int(np.count_nonzero(maze.right[:, :-1] == 0)) + int(np.count_nonzero(maze.bottom[:-1, :] == 0))
+    assert passages == rows * cols - 1
+    assert np.all(maze.right[:, -1] == 1) and np.all(maze.bottom[-1, :] == 1)
+    distances = MazeSolver(cache_size=1)
+    distances.load(maze)
+    assert np.all(distances.distance_field(Point(0, 0, 0, 0, 0)) >= 0)
+
+
+@pytest.mark.parametrize("rows, cols, band_rows", [(1, 1, 1), (1, 12, 1), (12, 1, 2), (9, 9, 1),
+                                                   (23, 17, 4), (40, 31, 7)])
+def test_parallel_generator_is_perfect(rows, cols, band_rows):
+    for seed in range(4):
+        maze = ParallelMazeGenerator(seed, band_rows=band_rows, workers=1).generate_maze(rows, cols)
+        assert maze.shape == (rows, cols)
+        assert_perfect(maze)
+
+
+def test_parallel_generator_workers_do_not_change_the_maze():
+    inline = ParallelMazeGenerator(11, band_rows=6, workers=1).generate_maze(30, 20)
+    pooled = ParallelMazeGenerator(11, band_rows=6, workers=2).generate_maze(30, 20)
+    assert inline == pooled
+    assert_perfect(pooled)
+    assert MazeInterface().generate_maze(30, 20, algorithm="parallel", seed=11).shape == (30, 20)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy", "tree"])
+def test_solve_batch_matches_single_queries(engine):
+    maze = LinearMazeGenerator(8).generate_maze(14, 17)
+    rng = random.Random(engine)
+    pairs = [(Point(0, 0, 0, rng.randrange(14), rng.randrange(17)), Point(0, 0, 0, rng.randrange(14), rng.randrange(17)))
+             for _ in range(60)]
+    expected = [MazeSolver().solve(from_point, to_point, maze) for from_point, to_point in pairs]
+    interface = MazeSolverInterface()
+    assert list(interface.solve_batch(pairs, maze, engine=engine, workers=2, chunk_size=7)) == expected
+    queries = [(a.x, a.y, b.x, b.y) for a, b in pairs]
+    assert list(interface.solve_batch(queries, maze, engine=engine, workers=1)) == expected
+
+
+def test_solve_batch_rejects_unknown_engine_or_strategy(maze_generator):
+    maze = maze_generator.generate_maze(3, 3)
+    with pytest.raises(ValueError):
+        list(MazeSolverInterface().solve_batch([(0, 0, 2, 2)], maze, engine="gpu"))
+    with pytest.raises(ValueError):
+        list(MazeSolverInterface().solve_batch([(0, 0, 2, 2)], maze, engine="numpy", strategy="astar", workers=1))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_batch_tree_engine_rejects_imperfect_maze_for_any_worker_count(maze_generator, workers):
+    maze = maze_generator.generate_maze(4, 4)
+    maze.right[:2, 0] = 0
+    maze.bottom[0, :2] = 0
+    with pytest.raises(ValueError, match="needs a perfect maze"):
+        list(MazeSolverInterface().solve_batch([(0, 0, 3, 3)], maze, engine="tree", workers=workers))
+    with pytest.raises(ValueError, match="not supported"):
+        list(MazeSolverInterface().solve_batch([(0, 0, 3, 3)], maze, engine="numpy", strategy="astar",
+                                               workers=workers))
+
+
+def test_incremental_solver_matches_fresh_solves():
+    rng = random.Random(19)
+    for seed in range(6):
+        rows, cols = rng.randrange(2, 12), rng.randrange(2, 12)
+        maze = LinearMazeGenerator(seed).generate_maze(rows, cols)
+        source = Point(0, 0, 0, rng.randrange(rows), rng.randrange(cols))
+        solver = IncrementalMazeSolver()
+        solver.start(maze, source)
+        for _ in range(40):
+            if rng.random() < 0.5:
+                solver.toggle_wall(rng.randrange(rows), rng.randrange(cols - 1), "right")
+            else:
+                solver.toggle_wall(rng.randrange(rows - 1), rng.randrange(cols), "bottom")
+            fresh = MazeSolver()
+            fresh.load(maze)
+            assert np.array_equal(solver.distance_field(), fresh.distance_field(source))
+            target = Point(0, 0, 0, rng.randrange(rows), rng.randrange(cols))
+            assert solver.path_to(target) == MazeSolver().solve(source, target, maze)
+
+
+def test_incremental_solver_repairs_only_changed_cells():
+    maze = MazeGrid.empty(1, 4)
+    maze.right[:] = 0
+    maze.right[0, 3] = 1
+    solver = IncrementalMazeSolver()
+    solver.start(maze, Point(0, 0, 0, 0, 0))
+    solver.set_wall(0, 2, "right", True)
+    assert solver.repaired == 1 and solver.path_to(Point(0, 0, 0, 0, 3)) == []
+    solver.set_wall(0, 2, "right", True)
+    assert solver.repaired == 0
+    assert solver.toggle_wall(0, 2, "right") is False
+    assert solver.distance_field().tolist() == [[0, 1, 2, 3]]
+    with pytest.raises(ValueError):
+        solver.set_wall(0, 3, "right", False)
+    with pytest.raises(ValueError):
+        solver.set_wall(0, 0, "left", False)
+
+
+def test_solver_interface_sees_incremental_edits(maze_generator):
+    maze = maze_generator.generate_maze(8, 8)
+    from_point = Point(0, 0, 0, 0, 0)
+    to_point = Point(0, 0, 0, 7, 7)
+    interface = MazeSolverInterface()
+    path = interface.solve(from_point, to_point, maze)
+    editor = IncrementalMazeSolver()
+    editor.start(maze, from_point)
+    # Closing any passage on the only path of a perfect maze disconnects its ends
+    (row, col), (next_row, next_col) = sorted(path[:2])
+    editor.set_wall(row, col, "right" if row == next_row else "bottom", closed=True)
+    assert editor.path_to(to_point) == []
+    for engine in ("python", "numpy"):
+        assert interface.solve(from_point, to_point, maze, engine=engine) == []
+
+
+def test_wave_run_matches_solve(maze_generator):
+    maze = maze_generator.generate_maze(9, 11)
+    for from_point, to_point in [(maze[0][0], maze[8][10]), (maze[4][5], maze[4][5]), (maze[8][0], maze[0][10])]:
+        solver = MazeSolver()
+        run = WaveRun(solver.iter_wave(from_point, to_point, maze))
+        waves = []
+        while not run.done:
+            waves += [wave for wave in run.advance(0) if wave]
+        assert run.path == MazeSolver().solve(from_point, to_point, maze)
+        assert waves[0] == [(from_point.x, from_point.y)]
+        for step, wave in enumerate(waves[1:-1], start=1):
+            assert all(solver.length_map[row][col] == step for row, col in wave)
+        # Every reached cell is shown, including the part of the last wave found before the target
+        reached = {(row, col) for row, col in zip(*np.nonzero(solver.length_map != -1))}
+        assert {cell for wave in waves for cell in wave} == reached
+    assert WaveRun(MazeSolver().iter_wave(maze[0][0], maze[8][10], maze)).finish() == \
+        MazeSolver().solve(maze[0][0], maze[8][10], maze)
+
+
+def test_wave_run_splits_large_waves(monkeypatch):
+    monkeypatch.setattr(maze_solver_module, "WAVE_CHUNK_CELLS", 16)
+    maze = MazeGrid.empty(30, 40)
+    maze.right[:, -1] = 1
+    maze.bottom[-1, :] = 1
+    solver = MazeSolver()
+    waves = solver.iter_wave(Point(0, 0, 0, 15, 20), Point(0, 0, 0, 29, 0), maze)
+    reached = []
+    while True:
+        try:
+            wave = next(waves)
+        except StopIteration as stop:
+            path = stop.value
+            break
+        # Every expanded cell adds at most 4 new ones
+        assert len(wave) <= 4 * 16
+        reached += wave
+    assert path == MazeSolver().solve(Point(0, 0, 0, 15, 20), Point(0, 0, 0, 29, 0), maze)
+    lengths = [solver.length_map[row, col] for row, col in reached[:-1]]
+    assert lengths == sorted(lengths) and max(lengths) == 33
+
+
+def test_wave_run_bounds_the_work_per_step(monkeypatch):
+    monkeypatch.setattr(maze_solver_module, "WAVE_CHUNK_CELLS", 64)
+    monkeypatch.setattr(maze_solver_module, "LOAD_CHUNK_CELLS", 1000)
+    maze = MazeInterface().generate_maze(100, 120, algorithm="binary_tree", seed=1)
+    solver = MazeSolver()
+    waves = solver.iter_wave(Point(0, 0, 0, 50, 60), Point(0, 0, 0, 0, 0), maze)
+    # The distance map is filled in bands of 1000 // 120 = 8 rows, one yield each
+    fills = 0
+    while not next(waves):
+        fills += 1
+    assert fills == 13 and solver.expanded == 0
+    expanded = []
+    for _ in waves:
+        expanded.append(solver.expanded)
+    steps = [after - before for before, after in zip([0] + expanded, expanded)]
+    assert max(steps) <= 64 and len(expanded) > 100 * 120 // 64
+
+
+def test_mark_pyramid_matches_density_levels(maze_generator):
+    maze = maze_generator.generate_maze(7, 12)
+    levels = mark_pyramid(7, 12)
+    assert [level.shape for level in levels] == [level.shape for level in wall_density_pyramid(maze)]
+    mark_cells(levels, np.array([[6, 11], [0, 1]]), 2)
+    assert levels[0][6, 11] == 2 and levels[1][3, 5] == 2 and levels[1][0, 0] == 2
+    assert levels[-1][0, 0] == 2 and levels[0].sum() == 4
+
+
+def test_distance_field_gives_the_solve_path(maze_generator):
+    maze = maze_generator.generate_maze(8, 13)
+    interface = MazeSolverInterface()
+    start = maze[3][4]
+    field = interface.distance_field(start, maze)
+    fresh = MazeSolver()
+    fresh.load(maze)
+    assert np.array_equal(field, fresh.distance_field(start))
+    for end in (maze[7][12], maze[0][0], maze[3][4]):
+        assert interface.path_in_field(field, start, end) == MazeSolver().solve(start, end, maze)
+
+
+def test_heat_levels_and_path_corners():
+    levels = heat_levels(np.array([[0, 1, 2], [-1, 4, 3]], dtype=np.int32))
+    assert levels[0].tolist() == [[1, 64, 128], [0, 255, 191]]
+    assert [level.shape for level in levels] == [(2, 3), (1, 2), (1, 1)]
+    palette = heat_palette([(0, 0, 255), (255, 0, 0)])
+    assert len(palette) == 256 and palette[0] == 0 and palette[1] == 0xFF0000FF and palette[255] == 0xFFFF0000
+    path = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1)]
+    assert path_corners(path).tolist() == [[0, 0], [0, 2], [2, 2], [2, 1]]
+    assert path_corners([(4, 4)]).tolist() == [[4, 4]]
+
+
+def test_png_export_matches_in_memory_image(tmp_path, monkeypatch):
+    from PIL import Image
+
+    maze = LinearMazeGenerator(4).generate_maze(9, 14)
+    path = MazeSolver().solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 8, 13), maze)
+    write_binary(tmp_path / "maze.maze", maze)
+    # Bands of a single maze row, every band is rasterized and compressed on its own
+    monkeypatch.setattr(maze_image, "TILE_PIXELS", 1)
+    for source, route in [(maze, path), (open_binary(tmp_path / "maze.maze"), None)]:
+        expected = maze_image.maze_image(maze, route, cell_size=5, wall_width=2)
+        assert maze_image.write_png(tmp_path / "maze.png", source, route, cell_size=5, wall_width=2) == (72, 47)
+        with Image.open(tmp_path / "maze.png") as image:
+            assert np.array_equal(np.asarray(image.convert("RGB")), np.asarray(expected.convert("RGB")))
+
+    pixels = np.asarray(maze_image.maze_image(maze, path, cell_size=5, wall_width=2))
+    assert (pixels[:2] == maze_image.WALL).all() and (pixels[:, :2] == maze_image.WALL).all()
+    assert pixels[2, 2] == maze_image.PATH and pixels[-3, -3] == maze_image.PATH
+    # Bottom walls of maze row 4, sampled inside every cell
+    assert np.array_equal(pixels[2 + 5 * 4 + 3, 3::5] == maze_image.WALL, maze.bottom[4] == 1)
+    with pytest.raises(ValueError):
+        maze_image.maze_image(maze, cell_size=2, wall_width=2)
+
+
+def test_cli_render(tmp_path, capsys):
+    from PIL import Image
+
+    maze = LinearMazeGenerator(4).generate_maze(5, 7)
+    write_file(tmp_path / "maze.txt", maze)
+    assert cli.main(["render", str(tmp_path / "maze.txt"), str(tmp_path / "maze.png"), "--cell-size", "3",
+                     "--path", "0", "0", "4", "6"]) == 0
+    assert capsys.readouterr().out.split()[-1] == "22x16"
+    with Image.open(tmp_path / "maze.png") as image:
+        assert image.size == (22, 16) and image.mode == "P"
+
+
+def test_maze_corpus_round_trip(tmp_path, monkeypatch):
+    import frontend.parser.maze_corpus as maze_corpus
+
+    monkeypatch.setattr(maze_corpus, "FLUSH_MAZES", 3)
+    mazes = [LinearMazeGenerator(seed).generate_maze(2 + seed % 5, 1 + seed % 13) for seed in range(10)]
+    filename = tmp_path / "corpus.h5"
+    with MazeCorpus(filename, "w") as corpus:
+        assert corpus.extend((maze, seed, "linear", {"band": seed}) for seed, maze in enumerate(mazes)) == list(range(10))
+    with MazeCorpus(filename, "a") as corpus:
+        assert corpus.append(mazes[4]) == 10
+
+    corpus = MazeCorpus(filename)
+    assert len(corpus) == 11 and list(corpus)[:10] == mazes and corpus[-1] == mazes[4]
+    assert corpus.info(7) == {"rows": 4, "cols": 8, "seed": 7, "mode": "linear", "params": {"band": 7}}
+    assert corpus.info(10) == {"rows": 6, "cols": 5, "seed": None, "mode": None, "params": {}}
+    assert corpus.read_rows(8, 1, 4) == MazeGrid(mazes[8].right[1:4], mazes[8].bottom[1:4])
+    assert pickle.loads(pickle.dumps(corpus))[9] == mazes[9]
+    with pytest.raises(IndexError):
+        corpus[11]
+    corpus.close()
+
+    import h5py
+
+    with h5py.File(tmp_path / "other.h5", "w"):
+        pass
+    with pytest.raises(ValueError):
+        MazeCorpus(tmp_path / "other.h5")
+
+
+def test_cli_generate_hdf5_corpus(tmp_path, capsys):
+    filename = str(tmp_path / "corpus.h5")
+    assert cli.main(["generate", "--size", "5x6", "--count", "3", "--seed", "2", "--format", "hdf5",
+                     "--out", filename, "--workers", "2"]) == 0
+    assert capsys.readouterr().out.split() == [filename, "mazes", "0..2"]
+    with MazeCorpus(filename) as corpus:
+        assert [corpus.info(i)["seed"] for i in range(3)] == [2, 3, 4]
+        assert corpus[1] == MazeInterface().generate_maze(5, 6, algorithm="linear", seed=3)
+
+
+def test_validator_counts_components_and_cycles(maze_generator):
+    maze = maze_generator.generate_maze(7, 9)
+    report = validate_maze(maze)
+    assert report.perfect and (report.components, report.cycles, report.passages) == (1, 0, 62)
+    assert np.all(report.labels == 0)
+
+    maze.right[:2, 0] = 0
+    maze.bottom[0, :2] = 0
+    cyclic = validate_maze(maze)
+    assert not cyclic.perfect and cyclic.components == 1 and cyclic.cycles == cyclic.passages - 62
+
+    # Two perfect mazes side by side, the border wall of the left one keeps them apart
+    left, right = maze_generator.generate_maze(7, 4), maze_generator.generate_maze(7, 5)
+    split = validate_maze(MazeGrid(np.hstack([left.right, right.right]), np.hstack([left.bottom, right.bottom])))
+    assert (split.components, split.cycles) == (2, 0) and not split.perfect
+    assert split.connected(Point(0, 0, 0, 0, 4), Point(0, 0, 0, 6, 8))
+    assert not split.connected(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 0, 4))
+    assert split.summary() == "7x9 maze is not perfect: 2 components, 0 cycles"
+
+    walls = np.ones((3, 4), dtype=np.uint8)
+    closed = validate_maze(MazeGrid(walls, walls.copy()))
+    assert (closed.components, closed.cycles) == (12, 0)
+    assert closed.labels.reshape(-1).tolist() == list(range(12))
+
+
+def test_validating_loaders_and_early_rejection(maze_generator, tmp_path, capsys):
+    maze = maze_generator.generate_maze(5, 6)
+    write_file(tmp_path / "perfect.txt", maze)
+    assert read_file(tmp_path / "perfect.txt", validate=True) == maze
+
+    left, right = maze_generator.generate_maze(5, 2), maze_generator.generate_maze(5, 4)
+    maze = MazeGrid(np.hstack([left.right, right.right]), np.hstack([left.bottom, right.bottom]))
+    write_file(tmp_path / "split.txt", maze)
+    write_binary(tmp_path / "split.maze", maze)
+    assert read_file(tmp_path / "split.txt") == maze
+    with pytest.raises(ValueError, match="2 components"):
+        read_file(tmp_path / "split.txt", validate=True)
+    with pytest.raises(ValueError, match="not perfect"):
+        read_binary(tmp_path / "split.maze", validate=True)
+    queries = tmp_path / "queries.txt"
+    queries.write_text("0 0 4 5\n")
+    assert cli.main(["solve", str(tmp_path / "split.maze"), str(queries), "--validate", "--workers", "1"]) == 1
+    assert "not perfect" in capsys.readouterr().err
+    queries.write_text("0 0 4\n")
+    assert cli.main(["solve", str(tmp_path / "split.maze"), str(queries), "--workers", "1"]) == 1
+    assert "queries.txt:1: expected" in capsys.readouterr().err
+
+    interface = MazeSolverInterface()
+    assert not interface.validate(maze).perfect
+    assert interface.validate(maze) is interface.report
+    assert interface.solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 4, 5), maze) == []
+    assert interface.expanded == 0
+    assert interface.solve(Point(0, 0, 0, 0, 0), Point(0, 0, 0, 4, 1), maze)[0] == (4, 1)
+    interface.invalidate()
+    assert interface.report is None
+
+
+@pytest.mark.parametrize("algorithm", ["binary_tree", "sidewinder", "kruskal", "wilson"])
+def test_registered_generators_are_perfect(algorithm):
+    interface = MazeInterface()
+    for rows, cols in [(1, 1), (1, 7), (7, 1), (2, 2), (9, 13), (16, 5)]:
+        for seed in range(3):
+            maze = interface.generate_maze(rows, cols, algorithm=algorithm, seed=seed)
+            assert isinstance(maze, MazeGrid) and maze.shape == (rows, cols)
+            assert_perfect(maze)
+            assert validate_maze(maze).perfect
+    assert interface.generate_maze(12, 10, algorithm=algorithm, seed=4) == \
+        interface.generate_maze(12, 10, algorithm=algorithm, seed=4)
+    rows_iter = interface.iter_rows(6, 4, algorithm=algorithm, seed=4)
+    assert MazeGrid.from_rows(rows_iter, 6, 4) == interface.generate_maze(6, 4, algorithm=algorithm, seed=4)
+    assert interface.generate_maze(0, 5, algorithm=algorithm).shape == (0, 5)
+
+
+def test_generator_registry():
+    interface = MazeInterface()
+    interface.register("eller", LinearMazeGenerator())
+    assert interface.generate_maze(5, 5, algorithm="eller", seed=3) == \
+        interface.generate_maze(5, 5, algorithm="linear", seed=3)
+    with pytest.raises(ValueError):
+        interface.generate_maze(5, 5, algorithm="unknown")
+    # Binary tree mazes always have straight corridors along the last row and column
+    maze = interface.generate_maze(8, 8, algorithm="binary_tree", seed=1)
+    assert np.all(maze.right[-1, :-1] == 0) and np.all(maze.bottom[:-1, -1] == 0)
+
+    # A grid generator without carve() fails when it is created, not when it is first used
+    class Unfinished(GridMazeGenerator):
+        pass
+    with pytest.raises(TypeError):
+        Unfinished()